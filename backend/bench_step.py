@@ -0,0 +1,179 @@
+"""
+Microbenchmark for Simulation.step.
+
+Runs the same routine through the scalar engine (core/simulation.py) and
+through ArrayEngine below, a copy of the previous engine that kept the pose
+in a 3-element NumPy array and applied every limit with np.clip. Reports the
+per-step cost of each and the largest difference between their states,
+which must stay within TOLERANCE.
+
+The scalar engine is timed as a session runs it by default: tracking
+statistics and seek snapshots on, telemetry off. It is also timed with
+telemetry on. ArrayEngine does none of this bookkeeping, so the speedup
+understates the gain on the step itself. Each figure is the best of
+`--repeat` rounds.
+
+Usage (from backend/):
+    python bench_step.py [path_file.json] [--steps N] [--repeat N]
+"""
+import argparse
+import json
+import math
+import os
+import time
+import numpy as np
+from core.simulation import Simulation
+
+TOLERANCE = 1e-9
+STATE_KEYS = ('x', 'y', 'theta', 'velocity', 'acceleration', 'jerk', 'time')
+DEFAULT_FILE = os.path.join(os.path.dirname(__file__), '..', 'blueLeft-1.json')
+
+class ArrayEngine(Simulation):
+    """The previous engine: NumPy pose array and np.clip on scalars"""
+    def start(self, *args, **kwargs):
+        super().start(*args, **kwargs)
+        self.pose = np.array([self.state.x, self.state.y, self.state.theta])
+        self.v = 0.0
+        self.a = 0.0
+        self.j = 0.0
+        self.prev_v = 0.0
+        self.prev_a = 0.0
+        self.t = 0.0
+        self.traveled = 0.0
+
+    def step(self, dt=0.01):
+        if not self.is_running or self.reference is None:
+            return None
+        ref = self.reference
+
+        target_velocity = ref.velocity_at(self.traveled)
+        self.closest_idx = ref.closest(self.pose[0], self.pose[1], self.closest_idx, self.search_window)
+
+        lookahead_distance = self.params.get('min_lookahead', 10.0) + self.params.get('lookahead_gain', 0.1) * target_velocity
+        ref_s = ref.s[self.closest_idx] + lookahead_distance
+        i, f = ref._locate(ref_s * ref.inv_ds, len(ref.s) - 1)
+        ref_pose = [
+            ref.x[i] + (ref.x[i + 1] - ref.x[i]) * f,
+            ref.y[i] + (ref.y[i + 1] - ref.y[i]) * f,
+            ref.theta[i] + (ref.theta[i + 1] - ref.theta[i]) * f
+        ]
+        referenceW = (ref.curvature[i] + (ref.curvature[i + 1] - ref.curvature[i]) * f) * target_velocity
+
+        max_w = self.params['max_angular_vel']
+        referenceW = np.clip(referenceW, -max_w, max_w)
+
+        v, w = self.controller.calculateControl(self.pose, ref_pose, target_velocity, referenceW)
+
+        velocity_error = v - self.v
+        max_accel_step = self.params['max_accel'] * dt
+        if velocity_error > max_accel_step:
+            velocity_error = max_accel_step
+        elif velocity_error < -max_accel_step:
+            velocity_error = -max_accel_step
+        self.v += velocity_error
+        self.v = np.clip(self.v, 0, self.params['max_vel'])
+
+        w = np.clip(w, -max_w, max_w)
+        self.pose[0] += self.v * math.sin(self.pose[2]) * dt
+        self.pose[1] += self.v * math.cos(self.pose[2]) * dt
+        self.pose[2] = (self.pose[2] + (w * dt)) % (2 * math.pi)
+
+        rmin = self.params['field_min'] + self.params['robot_radius']
+        rmax = self.params['field_max'] - self.params['robot_radius']
+        self.pose[0] = np.clip(self.pose[0], rmin, rmax)
+        self.pose[1] = np.clip(self.pose[1], rmin, rmax)
+
+        new_acceleration = (self.v - self.prev_v) / dt
+        self.j = (new_acceleration - self.prev_a) / dt
+        self.a = new_acceleration
+        self.prev_v = self.v
+        self.prev_a = self.a
+        self.t += dt
+        self.traveled += self.v * dt
+
+        distance_to_end = math.hypot(ref.x[-1] - self.pose[0], ref.y[-1] - self.pose[1])
+        path_completion = self.traveled / self.path_length if self.path_length > 0 else 0
+        if (path_completion >= 0.95 and distance_to_end < 8.0 and abs(self.v) < 2.0) or \
+           (self.traveled > self.path_length * 1.1):
+            self.is_running = False
+
+        return {
+            'x': self.pose[0], 'y': self.pose[1], 'theta': self.pose[2],
+            'velocity': self.v, 'acceleration': self.a, 'jerk': self.j,
+            'time': self.t, 'finished': not self.is_running
+        }
+
+def load_routine(path):
+    with open(path) as f:
+        data = json.load(f)
+    trajectory = data['trajectory']
+    profile = data['motion_profile']['profile_points']
+    length = data['metadata']['path_length']
+    first = trajectory[0]
+    start_pose = [first['x'], first['y'], first['theta'] % (2 * math.pi)]
+    return trajectory, profile, length, start_pose
+
+def run_states(engine_cls, routine, params):
+    """Every state of one run, cut off like Simulation.run"""
+    sim = engine_cls()
+    sim.start(*routine[:3], params, routine[3])
+    max_steps = int((2 * sim.total_time + 5.0) / 0.01)
+    states = []
+    while sim.is_running and len(states) < max_steps:
+        states.append(sim.step(0.01))
+    return states
+
+def time_engine(engine_cls, routine, params, steps, repeat=1):
+    """Mean seconds per step over at least `steps` steps of repeated runs, best of `repeat` rounds"""
+    return min(_time_round(engine_cls, routine, params, steps) for _ in range(max(1, repeat)))
+
+def _time_round(engine_cls, routine, params, steps):
+    sim = engine_cls()
+    done = 0
+    elapsed = 0.0
+    while done < steps:
+        sim.start(*routine[:3], params, routine[3])
+        n = 0
+        t0 = time.perf_counter()
+        while sim.is_running and n < 1000:
+            sim.step(0.01)
+            n += 1
+        elapsed += time.perf_counter() - t0
+        done += n
+    return elapsed / done
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path_file', nargs='?', default=DEFAULT_FILE)
+    parser.add_argument('--steps', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    routine = load_routine(args.path_file)
+    params = {'kx': 1.5, 'ky': 3.0, 'ktheta': 2.0}
+
+    # Equivalence over one full run
+    scalar = run_states(Simulation, routine, params)
+    array = run_states(ArrayEngine, routine, params)
+    n = min(len(scalar), len(array))
+    max_diff = max(
+        (abs(float(scalar[i][k]) - float(array[i][k])) for i in range(n) for k in STATE_KEYS),
+        default=0.0
+    )
+
+    before = time_engine(ArrayEngine, routine, params, args.steps, args.repeat)
+    after = time_engine(Simulation, routine, params, args.steps, args.repeat)
+    recording = time_engine(Simulation, routine, dict(params, telemetry=True), args.steps, args.repeat)
+
+    print(f"steps compared:  {n} (scalar {len(scalar)}, array {len(array)})")
+    print(f"max state diff:  {max_diff:.3e} (tolerance {TOLERANCE:.0e})")
+    print(f"array engine:    {before * 1e6:8.2f} us/step")
+    print(f"scalar engine:   {after * 1e6:8.2f} us/step")
+    print(f"  + telemetry:   {recording * 1e6:8.2f} us/step")
+    print(f"speedup:         {before / after:8.2f}x ({before / recording:.2f}x with telemetry)")
+
+    if len(scalar) != len(array) or max_diff > TOLERANCE:
+        raise SystemExit("Scalar engine diverged from the array engine")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+_ARTIFACT_ID = re.compile(r'^[0-9a-f]{64}$')
+
+def content_hash(*parts):
+    """SHA-256 hex digest of the canonical JSON encoding of parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# Named caches, for reporting hit rates
+CACHES = {}
+
+def register_cache(name, cache):
+    """Record a cache (anything with hits, misses and len()) under name; returns it"""
+    CACHES[name] = cache
+    return cache
+
+class LRUCache:
+    """Small in-memory least-recently-used cache with hit/miss counters"""
+    def __init__(self, max_items=32):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key in self.items:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return self.items[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+class ResultCache:
+    """
+    Cache of completed simulation runs keyed by content hash.
+
+    Each entry is a structured NumPy array of per-step rows plus a small
+    summary dict. Entries live in a byte-bounded in-memory LRU and, when
+    `directory` is set, are mirrored to .npz files there (also byte-bounded,
+    oldest-accessed evicted first) so they survive restarts. Safe to use
+    from several threads; disk reads and writes happen outside the lock.
+    """
+    def __init__(self, max_bytes=64 * 2**20, directory=None, max_disk_bytes=512 * 2**20):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """(rows, summary) for key, or None"""
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                with np.load(path) as data:
+                    entry = (data['rows'], json.loads(str(data['summary'])))
+                os.utime(path) # Mark as recently used for disk eviction
+            except (OSError, KeyError, ValueError):
+                entry = None
+            if entry is not None:
+                with self.lock:
+                    self.hits += 1
+                self._remember(key, entry)
+                return entry
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, rows, summary):
+        entry = (rows, summary)
+        self._remember(key, entry)
+        if self.directory:
+            tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                np.savez_compressed(f, rows=rows, summary=np.array(json.dumps(summary)))
+            os.replace(tmp, self._path(key))
+            self._evict_disk()
+
+    def _remember(self, key, entry):
+        with self.lock:
+            if key in self.items:
+                self.bytes -= self.items.pop(key)[0].nbytes
+            self.items[key] = entry
+            self.bytes += entry[0].nbytes
+            while self.bytes > self.max_bytes and len(self.items) > 1:
+                _, (rows, _) = self.items.popitem(last=False)
+                self.bytes -= rows.nbytes
+
+    def _evict_disk(self):
+        # Other threads may be evicting too: files can vanish at any point
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    def __len__(self):
+        return len(self.items)
+
+class ArtifactStore:
+    """
+    Generated trajectories and profiles kept under their content hash, so
+    later requests can refer to them by id instead of uploading them again.
+
+    An entry expires `ttl` seconds after it was last stored or read. At most
+    `max_items` are kept in memory; with `directory` set they are also written
+    there as JSON, which lets worker processes sharing the directory resolve
+    each other's ids.
+    """
+    def __init__(self, ttl=600.0, max_items=256, directory=None):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.directory = directory
+        self.items = OrderedDict() # id -> (kind, value, expires)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, artifact_id):
+        return os.path.join(self.directory, f"{artifact_id}.json")
+
+    def put(self, kind, value):
+        """Store value under kind; returns its id"""
+        artifact_id = content_hash(kind, value)
+        self._remember(artifact_id, kind, value)
+        if self.directory:
+            path = self._path(artifact_id)
+            if os.path.exists(path):
+                os.utime(path)
+            else:
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump({'kind': kind, 'value': value}, f, separators=(',', ':'))
+                os.replace(tmp, path)
+                self._evict_disk()
+        return artifact_id
+
+    def get(self, kind, artifact_id):
+        """The stored value, or None if the id is unknown, expired or of another kind"""
+        now = time.time()
+        with self.lock:
+            entry = self.items.get(artifact_id)
+            if entry is not None and entry[2] < now:
+                del self.items[artifact_id]
+                entry = None
+        if entry is None and self.directory and _ARTIFACT_ID.match(artifact_id):
+            path = self._path(artifact_id)
+            try:
+                if os.path.getmtime(path) + self.ttl >= now:
+                    with open(path) as f:
+                        data = json.load(f)
+                    os.utime(path)
+                    entry = self._remember(artifact_id, data['kind'], data['value'])
+            except (OSError, KeyError, ValueError):
+                entry = None
+        if entry is None or entry[0] != kind:
+            self.misses += 1
+            return None
+        with self.lock:
+            if artifact_id in self.items:
+                self.items[artifact_id] = (kind, entry[1], now + self.ttl)
+                self.items.move_to_end(artifact_id)
+        self.hits += 1
+        return entry[1]
+
+    def _remember(self, artifact_id, kind, value):
+        entry = (kind, value, time.time() + self.ttl)
+        with self.lock:
+            self.items[artifact_id] = entry
+            self.items.move_to_end(artifact_id)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+        return entry
+
+    def _evict_disk(self):
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.items)
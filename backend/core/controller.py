@@ -1,4 +1,13 @@
 import math
+import numpy as np
+
+def feedforward_angular_velocity(curvature, linear_velocity):
+    """
+    Reference angular velocity for following a path of the given curvature
+    (dtheta/ds) at the given speed: omega_ref = kappa * v_ref.
+    Works element-wise on NumPy arrays for batch evaluation.
+    """
+    return curvature * linear_velocity
 
 class LTVUnicycleController:
     """Linear Time-Varying Unicycle Controller"""
@@ -6,8 +15,11 @@ class LTVUnicycleController:
         self.kx = kx
         self.ky = ky
         self.ktheta = ktheta
+        self.last_errors = (0.0, 0.0, 0.0) # (forward, lateral, heading) from the last call
     
-    def calculateControl(self, currentPose, referencePose, referenceLinearVelocity, referenceAngularVelocity):
+    def calculateControl(self, currentPose, referencePose, referenceLinearVelocity, referenceAngularVelocity,
+                         referenceDistance=None):
+        # referenceDistance is unused here; gain-scheduled controllers look their gains up by it
         currentTheta = (currentPose[2] + math.pi) % (2 * math.pi) - math.pi
         referenceTheta = (referencePose[2] + math.pi) % (2 * math.pi) - math.pi
         
@@ -22,6 +34,8 @@ class LTVUnicycleController:
         
         etheta = (referenceTheta - currentTheta + math.pi) % (2 * math.pi) - math.pi
         
+        self.last_errors = (ex_robot, ey_robot, etheta)
+        
         v = referenceLinearVelocity * math.cos(etheta) + self.kx * ex_robot
         
         if abs(referenceLinearVelocity) > 0.1:
@@ -30,3 +44,39 @@ class LTVUnicycleController:
             w = referenceAngularVelocity + self.ktheta * etheta
         
         return v, w
+    
+    def calculateControlBatch(self, currentPoses, referencePoses, referenceLinearVelocities, referenceAngularVelocities):
+        """
+        calculateControl over N poses at once: (N,3) poses, (N,3) references and
+        (N,) reference velocities in, (N,) v and w out. Same operations in the same
+        order as the scalar law, so results match it exactly. Does not touch last_errors.
+        """
+        currentPoses = np.asarray(currentPoses, dtype=float)
+        referencePoses = np.asarray(referencePoses, dtype=float)
+        vr = np.asarray(referenceLinearVelocities, dtype=float)
+        wr = np.asarray(referenceAngularVelocities, dtype=float)
+        
+        currentTheta = (currentPoses[:, 2] + math.pi) % (2 * math.pi) - math.pi
+        referenceTheta = (referencePoses[:, 2] + math.pi) % (2 * math.pi) - math.pi
+        
+        ex = referencePoses[:, 0] - currentPoses[:, 0]
+        ey = referencePoses[:, 1] - currentPoses[:, 1]
+        
+        sin_t = np.sin(currentTheta)
+        cos_t = np.cos(currentTheta)
+        ex_robot = ex * sin_t + ey * cos_t
+        ey_robot = ex * cos_t - ey * sin_t
+        
+        etheta = (referenceTheta - currentTheta + math.pi) % (2 * math.pi) - math.pi
+        
+        v = vr * np.cos(etheta) + self.kx * ex_robot
+        
+        # Low-speed branch where |v_ref| <= 0.1
+        moving = np.abs(vr) > 0.1
+        w = np.where(
+            moving,
+            wr + vr * (self.ky * ey_robot + self.ktheta * np.sin(etheta)),
+            wr + self.ktheta * etheta
+        )
+        
+        return v, w
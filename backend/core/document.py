@@ -0,0 +1,234 @@
+import codecs
+import json
+import math
+import numpy as np
+from .cache import content_hash
+
+# Version of the path document the robot loads (written by the legacy save_path_to_file)
+DOCUMENT_VERSION = '1.2'
+
+def _planned_velocity(trajectory, profile):
+    """Profile time, velocity and acceleration arrays, and each waypoint's curvature and planned velocity"""
+    prof_t = np.array([p['time'] for p in profile], dtype=float)
+    prof_v = np.array([p['velocity'] for p in profile], dtype=float)
+    prof_a = np.array([p.get('acceleration', 0.0) for p in profile], dtype=float)
+    if len(profile) >= 2:
+        prof_s = np.concatenate(([0.0], np.cumsum(0.5 * (prof_v[1:] + prof_v[:-1]) * np.diff(prof_t))))
+    else:
+        prof_s = prof_t = prof_v = np.zeros(2)
+
+    distance = np.array([p['distance'] for p in trajectory], dtype=float)
+    curvature = np.array([p.get('curvature', 0.0) for p in trajectory], dtype=float)
+    velocity = np.interp(distance, prof_s, prof_v, right=0.0)
+    return prof_t, prof_v, prof_a, curvature, velocity
+
+def _metadata(path_length, motion_profile, prof_t, prof_v, prof_a, curvature, velocity):
+    return {
+        'version': DOCUMENT_VERSION,
+        'path_length': float(path_length),
+        'total_time': float(prof_t[-1]),
+        'max_velocity': float(prof_v.max()),
+        'max_acceleration': float(np.abs(prof_a).max()) if len(prof_a) else 0.0,
+        'max_angular_velocity': float(np.abs(curvature * velocity).max()) if len(velocity) else 0.0,
+        'profile_type': (motion_profile or {}).get('type'),
+    }
+
+def document_metadata(trajectory, profile, path_length, motion_profile=None):
+    """The v1.2 metadata computed from a trajectory and profile: length, duration and actual maxima"""
+    return _metadata(path_length, motion_profile, *_planned_velocity(trajectory, profile))
+
+def build_document(trajectory, profile, path_length, control_points=(), action_points=None,
+                   motion_profile=None, metadata=None):
+    """
+    v1.2 path document from generated data. Each waypoint gets the planned
+    velocity at its distance; the metadata limits default to the profile's
+    actual maxima, and `metadata` entries override them.
+    """
+    motion_profile = dict(motion_profile or {})
+    planned = _planned_velocity(trajectory, profile)
+    velocity = planned[-1]
+    return {
+        'metadata': dict(_metadata(path_length, motion_profile, *planned), **(metadata or {})),
+        'control_points': [{'x': float(p[0]), 'y': float(p[1])} for p in control_points],
+        'action_points': {str(k): v for k, v in (action_points or {}).items()},
+        'trajectory': [
+            {
+                'x': float(p['x']),
+                'y': float(p['y']),
+                'theta': float(p['theta']),
+                'distance': float(p['distance']),
+                'velocity': float(v),
+                'curvature': float(p.get('curvature', 0.0)),
+            }
+            for p, v in zip(trajectory, velocity.tolist())
+        ],
+        'motion_profile': dict(motion_profile, profile_points=list(profile)),
+    }
+
+# --- Validation ---
+
+# Fields every point must have as numbers, and fields that must be numbers when present
+TRAJECTORY_FIELDS = (('x', 'y', 'theta', 'distance'), ('curvature', 'velocity'))
+PROFILE_FIELDS = (('time', 'velocity'), ('acceleration', 'jerk'))
+
+def is_number(value):
+    """True for a finite int or float (not a bool)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def document_section(document, name, kind):
+    """document[name], which must be a `kind` (dict or list) when present; an empty one when absent"""
+    value = document.get(name)
+    if value is None:
+        return kind()
+    if not isinstance(value, kind):
+        raise ValueError(f"'{name}' must be {'an object' if kind is dict else 'a list'}")
+    return value
+
+def check_points(points, fields, section):
+    """ValueError unless points is a list of objects with the (required, optional) numeric fields"""
+    required, optional = fields
+    if not isinstance(points, list):
+        raise ValueError(f"'{section}' must be a list")
+    for i, point in enumerate(points):
+        if not isinstance(point, dict) \
+                or not all(is_number(point.get(name)) for name in required) \
+                or not all(is_number(point[name]) for name in optional if name in point):
+            raise ValueError(f"{section}[{i}] must be an object with numeric {', '.join(required)}")
+    return points
+
+# --- Checksums ---
+
+def document_checksums(document):
+    """SHA-256 of the trajectory and the motion profile (settings and points), for metadata['checksums']"""
+    return {
+        'trajectory': 'sha256:' + content_hash(document.get('trajectory')),
+        'motion_profile': 'sha256:' + content_hash(document.get('motion_profile')),
+    }
+
+def verify_checksums(document):
+    """{'trajectory': bool, 'motion_profile': bool}: which sections match the checksums they were saved with"""
+    metadata = document.get('metadata')
+    stored = metadata.get('checksums') if isinstance(metadata, dict) else None
+    if not isinstance(stored, dict):
+        stored = {}
+    actual = document_checksums(document)
+    return {name: stored.get(name) == digest for name, digest in actual.items()}
+
+# --- Streaming parse ---
+
+_INCOMPLETE = object()
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+class DocumentParser:
+    """
+    Incremental JSON parser for path documents, fed the bytes as they arrive.
+
+    The document and the objects in it are walked a token at a time, down to
+    the first array (the trajectory, the profile points). Each array element,
+    such as a single waypoint, is decoded whole once it has fully arrived.
+    Consumed text is dropped, so a large file is never held as one string or
+    re-scanned from the start. Errors give character offsets from the start
+    of the document.
+    """
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._dropped = 0 # Characters consumed and dropped before the buffer
+        self._stack = [] # [container, pending key, state]
+        self._result = _INCOMPLETE
+
+    def feed(self, chunk):
+        self._buffer += self._text.decode(chunk)
+        self._parse(final=False)
+
+    def close(self):
+        """The parsed document; ValueError if it was malformed or truncated"""
+        self._buffer += self._text.decode(b'', final=True)
+        self._parse(final=True)
+        if self._result is _INCOMPLETE:
+            raise ValueError("Truncated path document")
+        return self._result
+
+    def _offset(self):
+        """Character offset of the current position from the start of the document"""
+        return self._dropped + self._pos
+
+    def _leaf(self, final):
+        """A whole value at the current position, or _INCOMPLETE until more text arrives"""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError as e:
+            if final:
+                raise ValueError(f"Invalid path document: {e.msg} at {self._dropped + e.pos}") from None
+            return _INCOMPLETE
+        if not final and (end == len(self._buffer) or self._buffer[end] in _NUMBER_CHARS):
+            return _INCOMPLETE # A number cut at the end of a chunk may continue in the next
+        self._pos = end
+        return value
+
+    def _attach(self, value):
+        if not self._stack:
+            self._result = value
+            return
+        frame = self._stack[-1]
+        if isinstance(frame[0], dict):
+            frame[0][frame[1]] = value
+        else:
+            frame[0].append(value)
+        frame[2] = 'next'
+
+    def _parse(self, final):
+        buffer, stack = self._buffer, self._stack
+        while True:
+            while self._pos < len(buffer) and buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos == len(buffer):
+                break
+            char = buffer[self._pos]
+            if self._result is not _INCOMPLETE:
+                raise ValueError("Invalid path document: extra data after the end")
+            if not stack:
+                if char != '{':
+                    raise ValueError("Invalid path document: expected a JSON object")
+                stack.append([{}, None, 'first'])
+                self._pos += 1
+                continue
+
+            frame = stack[-1]
+            container, state = frame[0], frame[2]
+            closing = '}' if isinstance(container, dict) else ']'
+            if state in ('first', 'next') and char == closing:
+                self._pos += 1
+                stack.pop()
+                self._attach(container)
+            elif state == 'next':
+                if char != ',':
+                    raise ValueError(f"Invalid path document: expected ',' or '{closing}' at {self._offset()}")
+                self._pos += 1
+                frame[2] = 'key' if isinstance(container, dict) else 'value'
+            elif state == 'colon':
+                if char != ':':
+                    raise ValueError(f"Invalid path document: expected ':' at {self._offset()}")
+                self._pos += 1
+                frame[2] = 'value'
+            elif isinstance(container, dict) and state != 'value':
+                if char != '"':
+                    raise ValueError(f"Invalid path document: expected a key at {self._offset()}")
+                key = self._leaf(final)
+                if key is _INCOMPLETE:
+                    break
+                frame[1], frame[2] = key, 'colon'
+            elif char in '{[' and isinstance(container, dict):
+                self._pos += 1
+                stack.append([{} if char == '{' else [], None, 'first'])
+            else:
+                value = self._leaf(final)
+                if value is _INCOMPLETE:
+                    break
+                self._attach(value)
+
+        self._buffer = buffer[self._pos:]
+        self._dropped += self._pos
+        self._pos = 0
@@ -0,0 +1,195 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .profiling import profiled_call
+
+# The ProfileCapture of the request being profiled, if any: pooled work is then
+# profiled where it runs and the stats gathered into it
+profile_capture = contextvars.ContextVar('profile_capture', default=None)
+
+class Overloaded(Exception):
+    """Raised when a pool already has as much work running and queued as it accepts"""
+
+class BoundedExecutor:
+    """
+    Thread or process pool that keeps CPU-bound work off the event loop.
+    At most `workers` calls run at once and `max_queue` more wait; further
+    submissions raise Overloaded instead of piling up.
+    """
+    def __init__(self, name, workers=4, max_queue=32, kind='thread'):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind '{kind}'. Expected 'thread' or 'process'")
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self.lock = threading.Lock()
+        self.pool = None # Created on first use
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _executor(self):
+        if self.pool is None:
+            if self.kind == 'thread':
+                self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            else:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def _acquire(self):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise Overloaded(f"The {self.name} pool is full ({self.workers} running, {self.max_queue} queued)")
+
+    def _finish(self, on_done):
+        with self.lock:
+            self.in_flight -= 1
+            self.completed += 1
+        on_done()
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool and await its result"""
+        self._acquire()
+        return await self._submit(self.slots.release, fn, args, kwargs)
+
+    def reserve(self):
+        """A Reservation of one slot for a sequence of calls; raises Overloaded if the pool is full"""
+        self._acquire()
+        return Reservation(self)
+
+    async def _submit(self, on_done, fn, args, kwargs):
+        """Run fn in the pool, calling on_done() when it ends"""
+        call = functools.partial(fn, *args, **kwargs)
+        capture = profile_capture.get()
+        if capture is not None:
+            call = functools.partial(capture.call if self.kind == 'thread' else profiled_call, call)
+        if self.kind == 'thread':
+            call = functools.partial(contextvars.copy_context().run, call)
+        with self.lock:
+            self.in_flight += 1
+        try:
+            future = self._executor().submit(call)
+        except BaseException:
+            self._finish(on_done)
+            raise
+        # The slot frees when the work ends, even if the awaiting request is cancelled
+        future.add_done_callback(lambda _future: self._finish(on_done))
+        result = await asyncio.wrap_future(future)
+        if capture is not None and self.kind == 'process':
+            result, stats = result
+            capture.collect(stats)
+        return result
+
+    def stats(self):
+        with self.lock:
+            in_flight = self.in_flight
+            return {
+                'kind': self.kind,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'running': min(in_flight, self.workers),
+                'queued': max(0, in_flight - self.workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+class Reservation:
+    """
+    One slot of a BoundedExecutor held across sequential calls, such as the
+    chunks of one upload, so a request admitted once is not refused partway
+    through. Use as a context manager: the slot frees on exit, or when a call
+    still running then (its request was cancelled) ends.
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.lock = threading.Lock()
+        self.running = 0
+        self.closed = False
+
+    def _call_done(self):
+        with self.lock:
+            self.running -= 1
+            release = self.closed and self.running == 0
+        if release:
+            self.pool.slots.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool under this reservation and await its result"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Reservation already released")
+            self.running += 1
+        return await self.pool._submit(self._call_done, fn, args, kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.closed = True
+            release = self.running == 0
+        if release:
+            self.pool.slots.release()
+
+class Superseded(Exception):
+    """Raised for a coalesced call that a newer call with the same key replaced"""
+
+class Coalescer:
+    """
+    Latest-wins gate in front of a thread pool, for requests where only the
+    newest result matters (e.g. a path regenerated on every mouse move).
+
+    A call under a key supersedes every earlier call under that key: queued
+    ones are cancelled before they start, and running ones finish in the
+    background with their result discarded. Superseded callers get Superseded.
+    Must be used from the event loop.
+    """
+    def __init__(self):
+        self.latest = {}   # key -> generation of the newest call
+        self.pending = {}  # key -> task of the newest call
+        self.generation = 0
+        self.superseded = 0
+
+    async def run(self, key, pool, fn, *args, **kwargs):
+        if key is None:
+            return await pool.run(fn, *args, **kwargs)
+
+        self.generation += 1
+        generation = self.generation
+        self.latest[key] = generation
+
+        def call():
+            # Skip work that was superseded while it waited for a worker
+            if self.latest.get(key) != generation:
+                raise Superseded()
+            return fn(*args, **kwargs)
+
+        previous = self.pending.get(key)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.ensure_future(pool.run(call))
+        self.pending[key] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.latest.get(key) == generation:
+                raise # The caller itself was cancelled
+        except Superseded:
+            pass
+        finally:
+            if self.pending.get(key) is task:
+                del self.pending[key]
+                del self.latest[key]
+        self.superseded += 1
+        raise Superseded()
@@ -1,3 +1,4 @@
+import math
 import numpy as np
 
 def cubic_bezier(t, p0, p1, p2, p3):
@@ -7,3 +8,98 @@ def cubic_bezier(t, p0, p1, p2, p3):
 def cubic_bezier_derivative(t, p0, p1, p2, p3):
     """Calculate derivative (tangent) of cubic Bezier curve"""
     return 3*(1-t)**2 * (p1 - p0) + 6*(1-t)*t * (p2 - p1) + 3*t**2 * (p3 - p2)
+
+# Samples per segment, excluding each segment's start point
+BEZIER_SAMPLES = np.linspace(0.025, 1, 120)
+LINE_SAMPLES = np.linspace(0.05, 1, 20)
+
+PATH_FIELDS = ('x', 'y', 'theta', 'distance', 'curvature')
+
+def sample_path(control_points):
+    """
+    Discretize control points into path columns.
+
+    Every run of four points (sharing end points) is a cubic Bezier segment,
+    and a leftover pair a straight line. Returns a dict of equal-length arrays
+    x, y, theta (0-deg=Up), distance and curvature, and the path length.
+    """
+    pts = np.asarray(control_points, dtype=float).reshape(-1, 2)
+    segments, headings, steps = [], [], []
+    for i in range(0, len(pts) - 1, 3):
+        if i + 3 < len(pts):
+            p0, p1, p2, p3 = pts[i:i + 4]
+            t = BEZIER_SAMPLES[:, None]
+            seg = cubic_bezier(t, p0, p1, p2, p3)
+            derivative = cubic_bezier_derivative(t, p0, p1, p2, p3)
+            heading = np.arctan2(derivative[:, 0], derivative[:, 1])
+        else:
+            p0, p1 = pts[i:i + 2]
+            direction = p1 - p0
+            seg = p0 + direction * LINE_SAMPLES[:, None]
+            angle = np.arctan2(direction[0], direction[1]) if np.linalg.norm(direction) > 0 else 0.0
+            heading = np.full(len(seg), angle)
+        delta = np.diff(np.vstack((p0, seg)), axis=0)
+        segments.append(seg)
+        headings.append(heading)
+        steps.append(np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]))
+
+    if not segments:
+        empty = np.zeros(0)
+        return {name: empty for name in PATH_FIELDS}, 0.0
+
+    xy = np.concatenate(segments)
+    theta = np.concatenate(headings)
+    steps = np.concatenate(steps)
+    distance = np.cumsum(steps)
+
+    # Central-difference curvature; zero at the ends and where samples bunch up.
+    # Built from the local steps, not the running distance, so an edit upstream
+    # leaves the curvature of unchanged samples bit-identical.
+    curvature = np.zeros(len(theta))
+    if len(theta) > 2:
+        delta_angle = np.mod(theta[2:] - theta[:-2] + math.pi, 2 * math.pi) - math.pi
+        delta_dist = steps[1:-1] + steps[2:]
+        valid = delta_dist > 0.01
+        curvature[1:-1][valid] = delta_angle[valid] / delta_dist[valid]
+
+    columns = {'x': xy[:, 0], 'y': xy[:, 1], 'theta': theta, 'distance': distance, 'curvature': curvature}
+    return columns, float(distance[-1])
+
+def path_points(columns):
+    """Path columns as the list of waypoint dicts the API exchanges"""
+    names = PATH_FIELDS
+    return [dict(zip(names, row)) for row in zip(*(columns[name].tolist() for name in names))]
+
+def _same_point(a, b):
+    """Equal apart from cumulative distance"""
+    return a['x'] == b['x'] and a['y'] == b['y'] and a['theta'] == b['theta'] and a['curvature'] == b['curvature']
+
+def path_delta(base, points, max_fraction=0.5):
+    """
+    Single-range edit from the waypoints `base` to `points`: base[start:end]
+    is replaced by the returned points, and every later base point keeps its
+    place but has `distance_offset` added to its distance. Returns None when
+    the edit would carry more than `max_fraction` of the path.
+    """
+    n_base, n = len(base), len(points)
+    limit = min(n_base, n)
+    start = 0
+    while start < limit and base[start] == points[start]:
+        start += 1
+    tail = 0
+    while tail < limit - start and _same_point(base[n_base - 1 - tail], points[n - 1 - tail]):
+        tail += 1
+    if n == 0 or n - start - tail > max_fraction * n:
+        return None
+    return {
+        'start': start,
+        'end': n_base - tail,
+        'points': points[start:n - tail],
+        'distance_offset': points[-1]['distance'] - base[-1]['distance'] if tail else 0.0,
+    }
+
+def apply_path_delta(base, delta):
+    """The waypoints a path_delta describes, exactly as a client rebuilds them"""
+    offset = delta['distance_offset']
+    tail = [dict(p, distance=p['distance'] + offset) for p in base[delta['end']:]]
+    return base[:delta['start']] + delta['points'] + tail
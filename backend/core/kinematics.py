@@ -0,0 +1,56 @@
+import math
+
+# Unicycle kinematics in the 0-deg=Up frame:
+#   dx/dt = v * sin(theta), dy/dt = v * cos(theta), dtheta/dt = w
+# Each integrator advances (x, y, theta) by dt holding v and w constant.
+# Theta is returned unwrapped; callers wrap it.
+
+def euler_step(x, y, theta, v, w, dt):
+    """Forward Euler. First order; needs small dt."""
+    return (
+        x + v * math.sin(theta) * dt,
+        y + v * math.cos(theta) * dt,
+        theta + w * dt
+    )
+
+def exact_step(x, y, theta, v, w, dt):
+    """Closed-form arc update. Exact for constant v and w at any dt."""
+    new_theta = theta + w * dt
+    if abs(w * dt) < 1e-9:
+        # Straight-line limit (also avoids dividing by ~0)
+        mid = theta + 0.5 * w * dt
+        return (
+            x + v * math.sin(mid) * dt,
+            y + v * math.cos(mid) * dt,
+            new_theta
+        )
+    radius = v / w
+    return (
+        x + radius * (math.cos(theta) - math.cos(new_theta)),
+        y + radius * (math.sin(new_theta) - math.sin(theta)),
+        new_theta
+    )
+
+def rk4_step(x, y, theta, v, w, dt):
+    """Classic fourth-order Runge-Kutta"""
+    # Heading is linear in time, so only the position slopes differ per stage
+    th_mid = theta + 0.5 * w * dt
+    th_end = theta + w * dt
+    sin_mid = math.sin(th_mid)
+    cos_mid = math.cos(th_mid)
+    return (
+        x + v * dt / 6 * (math.sin(theta) + 4 * sin_mid + math.sin(th_end)),
+        y + v * dt / 6 * (math.cos(theta) + 4 * cos_mid + math.cos(th_end)),
+        th_end
+    )
+
+INTEGRATORS = {
+    'euler': euler_step,
+    'exact': exact_step,
+    'rk4': rk4_step,
+}
+
+def get_integrator(name):
+    if name not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator '{name}'. Choose from: {', '.join(INTEGRATORS)}")
+    return INTEGRATORS[name]
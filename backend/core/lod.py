@@ -0,0 +1,62 @@
+import numpy as np
+
+# Douglas-Peucker tolerances of the path pyramid, in field units (1/64 to 16)
+PATH_TOLERANCES = tuple(2.0 ** k / 64 for k in range(11))
+
+def douglas_peucker_significance(x, y):
+    """
+    Tolerance at which each point drops out of a Douglas-Peucker simplification.
+
+    One full DP pass records, for every split point, its distance from the
+    chord it split, capped by the value of the range it came from (a range is
+    only split if its parent was). Simplifying with tolerance `tol` keeps
+    exactly the points whose significance exceeds `tol`. The end points are
+    always kept.
+    """
+    n = len(x)
+    significance = np.zeros(n)
+    if n == 0:
+        return significance
+    significance[0] = significance[-1] = np.inf
+
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        start, end, parent = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        chord = np.hypot(dx, dy)
+        if chord > 0:
+            dist = np.abs(px * dy - py * dx) / chord
+        else:
+            dist = np.hypot(px, py) # Closed loop: distance from the start point
+        i = int(np.argmax(dist))
+        value = min(float(dist[i]), parent)
+        split = start + 1 + i
+        significance[split] = value
+        stack.append((start, split, value))
+        stack.append((split, end, value))
+    return significance
+
+class PathLOD:
+    """
+    Douglas-Peucker pyramid of a path: the kept point indices at each of
+    `tolerances`, all derived from one significance pass.
+    """
+    def __init__(self, x, y, tolerances=PATH_TOLERANCES):
+        significance = douglas_peucker_significance(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        self.count = len(significance)
+        self.levels = [(0.0, np.arange(self.count))]
+        for tolerance in tolerances:
+            indices = np.flatnonzero(significance > tolerance)
+            if len(indices) < len(self.levels[-1][1]):
+                self.levels.append((tolerance, indices))
+
+    def level(self, tolerance):
+        """(level tolerance, indices) of the coarsest level within `tolerance`"""
+        chosen = self.levels[0]
+        for level in self.levels:
+            if level[0] <= tolerance:
+                chosen = level
+        return chosen
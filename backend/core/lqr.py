@@ -0,0 +1,151 @@
+import math
+import numpy as np
+from .cache import LRUCache, content_hash, register_cache
+
+# --- Riccati solve ---
+
+def solve_care(A, B, Q, R):
+    """
+    Stabilizing solution P of the continuous algebraic Riccati equation
+    A'P + PA - PBR^-1B'P + Q = 0, from the stable invariant subspace of the
+    Hamiltonian matrix. Raises ValueError if (A, B) cannot be stabilized.
+    """
+    n = A.shape[0]
+    R_inv = np.linalg.inv(R)
+    H = np.block([
+        [A, -B @ R_inv @ B.T],
+        [-Q, -A.T]
+    ])
+    eigvals, eigvecs = np.linalg.eig(H)
+    stable = eigvecs[:, eigvals.real < 0]
+    if stable.shape[1] != n:
+        raise ValueError("Riccati equation has no stabilizing solution")
+    U1, U2 = stable[:n], stable[n:]
+    P = np.real(U2 @ np.linalg.inv(U1))
+    return 0.5 * (P + P.T)
+
+def unicycle_error_model(v_r, w_r):
+    """
+    Tracking error dynamics linearized about a reference moving at (v_r, w_r).
+    State: (forward, lateral, heading) error in the robot frame.
+    Input: (v_r*cos(e_theta) - v, w_r - w).
+    """
+    A = np.array([
+        [0.0, w_r, 0.0],
+        [-w_r, 0.0, v_r],
+        [0.0, 0.0, 0.0]
+    ])
+    B = np.array([
+        [1.0, 0.0],
+        [0.0, 0.0],
+        [0.0, 1.0]
+    ])
+    return A, B
+
+def lqr_gain(v_r, w_r, Q, R):
+    """2x3 state-feedback gain K = R^-1 B'P for the error model at (v_r, w_r)"""
+    A, B = unicycle_error_model(v_r, w_r)
+    P = solve_care(A, B, Q, R)
+    return np.linalg.solve(R, B.T @ P)
+
+# --- Gain table ---
+
+class GainTable:
+    """
+    LQR gains precomputed along a ReferenceTable, indexed by distance along
+    the path. Each entry is solved at the planned speed and turn rate there,
+    with the speed held at or above `min_velocity`: below it the lateral error
+    is barely controllable and the Riccati solve degenerates.
+
+    The default weights favour lateral and heading error and make turn-rate
+    corrections expensive, which keeps the lookahead tracking off the
+    max_angular_vel limit.
+    """
+    def __init__(self, reference, q=(0.25, 25.0, 16.0), r=(0.5, 36.0), spacing=1.0, min_velocity=1.0):
+        if not (math.isfinite(spacing) and spacing > 0):
+            raise ValueError("lqr_spacing must be a positive number")
+        Q = np.diag(np.asarray(q, dtype=float))
+        R = np.diag(np.asarray(r, dtype=float))
+
+        n = max(2, int(math.ceil(reference.length / spacing)) + 1)
+        self.s = np.linspace(0.0, reference.length, n)
+        self.ds = float(self.s[1] - self.s[0])
+        self.inv_ds = 1.0 / self.ds if self.ds > 0 else 0.0
+
+        v_r = np.maximum(np.interp(self.s, reference.s, reference.v), min_velocity)
+        w_r = np.interp(self.s, reference.s, reference.curvature) * v_r
+
+        self.gains = np.array([lqr_gain(v, w, Q, R) for v, w in zip(v_r, w_r)])
+
+        # Rows of (k11, k12, k13, k21, k22, k23) as plain floats for per-step lookups
+        self._rows = self.gains.reshape(n, 6).tolist()
+
+    def gain_at(self, s):
+        """Interpolated (k11, k12, k13, k21, k22, k23) at distance s"""
+        pos = s * self.inv_ds
+        last = len(self._rows) - 1
+        if pos <= 0:
+            return self._rows[0]
+        if pos >= last:
+            return self._rows[last]
+        i = int(pos)
+        f = pos - i
+        a, b = self._rows[i], self._rows[i + 1]
+        return [ka + (kb - ka) * f for ka, kb in zip(a, b)]
+
+_tables = register_cache('lqr_gains', LRUCache(max_items=16))
+
+def compile_gain_table(reference, q=(0.25, 25.0, 16.0), r=(0.5, 36.0), spacing=1.0, min_velocity=1.0):
+    """
+    Build (or reuse) the GainTable for a reference and set of weights.
+    Only references built through compile_reference carry a content key;
+    tables for any other reference are built fresh and not cached.
+    """
+    if reference.key is None:
+        return GainTable(reference, q=q, r=r, spacing=spacing, min_velocity=min_velocity)
+    key = content_hash(reference.key, list(q), list(r), spacing, min_velocity)
+    table = _tables.get(key)
+    if table is None:
+        table = GainTable(reference, q=q, r=r, spacing=spacing, min_velocity=min_velocity)
+        _tables.put(key, table)
+    return table
+
+# --- Controller ---
+
+class LQRController:
+    """
+    Gain-scheduled LQR tracking controller.
+    Same error definitions as LTVUnicycleController; the gains come from a
+    GainTable looked up at the reference point's distance along the path.
+    """
+    def __init__(self, table):
+        self.table = table
+        self.last_errors = (0.0, 0.0, 0.0) # (forward, lateral, heading) from the last call
+
+    def calculateControl(self, currentPose, referencePose, referenceLinearVelocity, referenceAngularVelocity,
+                         referenceDistance=0.0):
+        currentTheta = (currentPose[2] + math.pi) % (2 * math.pi) - math.pi
+        referenceTheta = (referencePose[2] + math.pi) % (2 * math.pi) - math.pi
+
+        ex = referencePose[0] - currentPose[0]
+        ey = referencePose[1] - currentPose[1]
+
+        # Robot-frame errors (0-deg=Up), as in LTVUnicycleController
+        ex_robot = ex * math.sin(currentTheta) + ey * math.cos(currentTheta)
+        ey_robot = ex * math.cos(currentTheta) - ey * math.sin(currentTheta)
+
+        etheta = (referenceTheta - currentTheta + math.pi) % (2 * math.pi) - math.pi
+
+        self.last_errors = (ex_robot, ey_robot, etheta)
+
+        k11, k12, k13, k21, k22, k23 = self.table.gain_at(referenceDistance)
+        v = referenceLinearVelocity * math.cos(etheta) + k11 * ex_robot
+        
+        if abs(referenceLinearVelocity) > 0.1:
+            v += k12 * ey_robot + k13 * etheta
+            w = referenceAngularVelocity + k21 * ex_robot + k22 * ey_robot + k23 * etheta
+        else:
+            # Stopped reference: only turn toward its heading, as LTVUnicycleController does
+            w = referenceAngularVelocity + k23 * etheta
+
+        return v, w
@@ -0,0 +1,126 @@
+import bisect
+import math
+import threading
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+class Metric:
+    """
+    Base for labelled metrics; children are keyed by their tuple of label values.
+    Pass `collect`, returning {label values tuple: value}, to compute the values
+    at scrape time instead of updating them as events happen.
+    """
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.collect = collect
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, label_values):
+        if len(label_values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}")
+        return tuple(str(v) for v in label_values)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) for each exposed sample"""
+        if self.collect is not None:
+            return [('', self._key(key), (), value) for key, value in self.collect().items()]
+        with self.lock:
+            return [('', key, (), value) for key, value in self.values.items()]
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labels, key, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *label_values, amount=1):
+        key = self._key(label_values)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, *label_values, value):
+        key = self._key(label_values)
+        with self.lock:
+            self.values[key] = value
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets, labels=()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        key = self._key(label_values)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        out = []
+        with self.lock:
+            for key, (counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (math.inf,), counts):
+                    cumulative += n
+                    out.append(('_bucket', key, (('le', _format_value(float(bound))),), cumulative))
+                out.append(('_sum', key, (), total))
+                out.append(('_count', key, (), count))
+        return out
+
+class Registry:
+    """A set of metrics rendered together for a /metrics scrape"""
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=(), collect=None):
+        return self.register(Counter(name, documentation, labels, collect))
+
+    def gauge(self, name, documentation, labels=(), collect=None):
+        return self.register(Gauge(name, documentation, labels, collect))
+
+    def histogram(self, name, documentation, buckets, labels=()):
+        return self.register(Histogram(name, documentation, buckets, labels))
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
@@ -0,0 +1,202 @@
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .reference import compile_reference
+from .simulation import Simulation, run_horizon, run_steps
+
+# --- Noise Models ---
+# A noise model draws one scalar per call from the generator it is handed.
+# Register new models in NOISE_MODELS to make them available to make_noise().
+
+class GaussianNoise:
+    """Normally distributed noise"""
+    def __init__(self, std, mean=0.0):
+        self.std = std
+        self.mean = mean
+
+    def sample(self, rng):
+        return rng.normal(self.mean, self.std)
+
+class UniformNoise:
+    """Uniformly distributed noise on [low, high)"""
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng):
+        return rng.uniform(self.low, self.high)
+
+NOISE_MODELS = {
+    'gaussian': GaussianNoise,
+    'uniform': UniformNoise,
+}
+
+def make_noise(spec):
+    """Build a noise model from a spec dict, e.g. {'type': 'gaussian', 'std': 0.5}"""
+    if not spec:
+        return None
+    spec = dict(spec)
+    kind = spec.pop('type', 'gaussian')
+    if kind not in NOISE_MODELS:
+        raise ValueError(f"Unknown noise model '{kind}'")
+    return NOISE_MODELS[kind](**spec)
+
+class Disturbance:
+    """
+    Seeded disturbances applied to one simulation run.
+
+    Spec keys (all optional, each a noise model spec):
+    - start_x, start_y, start_theta: one-off error on the start pose
+    - velocity: additive error on the applied linear velocity (units/s)
+    - slip: multiplicative error on the applied linear velocity (v * (1 + n))
+    - heading: additive error on the applied angular velocity (rad/s)
+    """
+    def __init__(self, spec, rng):
+        self.rng = rng
+        self.start_noise = [make_noise(spec.get(k)) for k in ('start_x', 'start_y', 'start_theta')]
+        self.velocity_noise = make_noise(spec.get('velocity'))
+        self.slip_noise = make_noise(spec.get('slip'))
+        self.heading_noise = make_noise(spec.get('heading'))
+
+    def perturb_start(self, start_pose):
+        return [
+            float(value + noise.sample(self.rng)) if noise is not None else float(value)
+            for value, noise in zip(start_pose, self.start_noise)
+        ]
+
+    def apply(self, v, w):
+        """Return the (v, w) the robot actually moves with for one step"""
+        if self.slip_noise is not None:
+            v = v * (1 + self.slip_noise.sample(self.rng))
+        if self.velocity_noise is not None:
+            v = v + self.velocity_noise.sample(self.rng)
+        if self.heading_noise is not None:
+            w = w + self.heading_noise.sample(self.rng)
+        return v, w
+
+# --- Trial Execution ---
+
+def _run_trials(trajectory, profile, path_length, params, start_pose, noise, seeds, dt, max_time):
+    """Run one chunk of trials. Module-level so it can be shipped to worker processes."""
+    final_point = trajectory[-1]
+    sim = Simulation()
+    reference = compile_reference(
+        trajectory, profile,
+        spacing=params.get('reference_spacing', 0.25),
+        curvature_smoothing=params.get('curvature_smoothing', 1.0)
+    )
+    results = []
+
+    for seed in seeds:
+        disturbance = Disturbance(noise, np.random.default_rng(seed))
+        sim.start(trajectory, profile, path_length, params, disturbance.perturb_start(start_pose), reference=reference)
+        sim.disturbance = disturbance
+        # A run cut off before its first step ends where it started
+        state = sim.run(dt=dt, max_time=max_time) or sim.state_dict()
+
+        position_error = math.hypot(final_point['x'] - state['x'], final_point['y'] - state['y'])
+        heading_error = abs((final_point['theta'] - state['theta'] + math.pi) % (2 * math.pi) - math.pi)
+        results.append((float(position_error), float(heading_error), float(state['time']), bool(state['finished'])))
+
+    return results
+
+def _distribution(values):
+    """Summary statistics for one metric across trials"""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return None
+
+    p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+    return {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'p5': float(p5),
+        'p25': float(p25),
+        'p50': float(p50),
+        'p75': float(p75),
+        'p95': float(p95),
+        'max': float(values.max()),
+    }
+
+class TrialPool:
+    """
+    Worker processes shared by every Monte Carlo run, started on first use.
+    A run splits its trials into at most `workers` chunks, so concurrent runs
+    queue for the same processes instead of each forking its own.
+    """
+    def __init__(self, workers=None):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.lock = threading.Lock()
+        self.pool = None
+
+    def executor(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self.pool
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+_default_pool = TrialPool()
+
+def run_monte_carlo(trajectory, profile, path_length, params, start_pose, noise=None,
+                    trials=100, seed=0, dt=0.01, max_time=None, workers=None, include_samples=False,
+                    pool=None):
+    """
+    Run `trials` disturbed simulations and report the spread of outcomes.
+
+    Every trial gets its own child of SeedSequence(seed), so results depend
+    only on the seed, never on how trials are split across worker processes.
+    `workers` is capped at the size of `pool` (default: one process per CPU).
+    """
+    if not trajectory:
+        raise ValueError("Trajectory is empty")
+    if trials < 1:
+        raise ValueError("At least one trial is required")
+    run_steps(dt, max_time if max_time is not None else run_horizon(profile[-1]['time'] if profile else 0.0))
+
+    noise = noise or {}
+    params = dict(params, telemetry=False, snapshot_interval=0) # Only outcomes are reported
+    seeds = np.random.SeedSequence(seed).spawn(trials)
+
+    pool = pool or _default_pool
+    workers = pool.workers if workers is None else min(workers, pool.workers)
+    workers = max(1, min(workers, trials))
+
+    args = (trajectory, profile, path_length, params, start_pose, noise)
+    if workers == 1:
+        results = _run_trials(*args, seeds, dt, max_time)
+    else:
+        chunks = [seeds[i::workers] for i in range(workers)]
+        executor = pool.executor()
+        futures = [executor.submit(_run_trials, *args, chunk, dt, max_time) for chunk in chunks]
+        chunk_results = [f.result() for f in futures]
+        # Undo the round-robin split so samples line up with trial indices
+        results = [None] * trials
+        for offset, chunk in enumerate(chunk_results):
+            results[offset::workers] = chunk
+
+    position_errors, heading_errors, times, finished = zip(*results)
+    report = {
+        'trials': trials,
+        'seed': seed,
+        'completed': int(sum(finished)),
+        'final_position_error': _distribution(position_errors),
+        'final_heading_error': _distribution(heading_errors),
+        'completion_time': _distribution([t for t, done in zip(times, finished) if done]),
+    }
+    if include_samples:
+        report['samples'] = {
+            'final_position_error': list(position_errors),
+            'final_heading_error': list(heading_errors),
+            'time': list(times),
+            'finished': list(finished),
+        }
+    return report
@@ -0,0 +1,187 @@
+import math
+import time
+import numpy as np
+
+class MPCController:
+    """
+    Linear time-varying model predictive controller.
+
+    Each tick linearizes the unicycle tracking error dynamics (see
+    core/lqr.unicycle_error_model) along the next `horizon` reference points,
+    `step` seconds apart, and solves the box-constrained QP over the input
+    corrections with FISTA (accelerated projected gradient), warm-started from
+    the previous tick's solution. Boxes keep the commanded v in [0, max_vel]
+    and w in [-max_w, max_w].
+
+    The solve stops at `deadline` seconds or `max_iterations` iterations,
+    whichever comes first. Every iterate is projected onto the boxes, so an
+    unconverged solve still gives a feasible input and the last iterate is
+    used. Only a tick whose deadline has passed before the solve starts falls
+    back to the fixed-gain LTV law, as do ticks where the reference has stopped.
+    """
+    def __init__(self, reference, fallback, q=(2.25, 9.0, 1.0), r=(0.05, 0.5), horizon=10, step=0.05,
+                 max_vel=60.0, max_w=3.0, deadline=0.005, max_iterations=100, tolerance=1e-4):
+        self.reference = reference
+        self.fallback = fallback
+        self.horizon = max(1, int(horizon))
+        self.step = float(step)
+        self.max_vel = float(max_vel)
+        self.max_w = float(max_w)
+        self.deadline_ns = int(deadline * 1e9)
+        self.max_iterations = int(max_iterations)
+        self.tolerance = float(tolerance)
+
+        n = self.horizon
+        self.Q = np.diag(np.asarray(q, dtype=float))
+        self.Q_bar = np.kron(np.eye(n), self.Q)
+        self.R_bar = np.kron(np.eye(n), np.diag(np.asarray(r, dtype=float)))
+        self.B = np.array([[1.0, 0.0], [0.0, 0.0], [0.0, 1.0]]) * self.step
+
+        self.warm = np.zeros(2 * n) # Previous solution (u1, u2 interleaved per step)
+        self.last_errors = (0.0, 0.0, 0.0)
+        self.last_solve_time = 0.0  # Seconds spent in the last calculateControl
+        self.last_iterations = 0
+
+        self.solves = 0
+        self.fallbacks = 0
+        self.truncated = 0 # Solves stopped by the deadline or the iteration cap before converging
+        self.total_solve_time = 0.0
+        self.max_solve_time = 0.0
+        self.total_iterations = 0
+
+    def _horizon_reference(self, s0, v0):
+        """Planned (v, w) at each horizon point, walking the path from s0"""
+        ref = self.reference
+        n = self.horizon
+        v = np.empty(n)
+        w = np.empty(n)
+        s = s0
+        speed = v0
+        for k in range(n):
+            v[k] = speed
+            w[k] = min(max(ref.curvature_at(s) * speed, -self.max_w), self.max_w)
+            s += speed * self.step
+            speed = ref.speed_at(s)
+        return v, w
+
+    def _prediction(self, v_ref, w_ref):
+        """Condensed prediction matrices: E = Phi e0 + Gamma U over the horizon"""
+        n = self.horizon
+        h = self.step
+        Phi = np.empty((3 * n, 3))
+        Gamma = np.zeros((3 * n, 2 * n))
+        A_prod = np.eye(3)
+        block = np.zeros((3, 2 * n))
+        for k in range(n):
+            A = np.array([
+                [1.0, w_ref[k] * h, 0.0],
+                [-w_ref[k] * h, 1.0, v_ref[k] * h],
+                [0.0, 0.0, 1.0]
+            ])
+            A_prod = A @ A_prod
+            block = A @ block
+            block[:, 2 * k:2 * k + 2] = self.B
+            Phi[3 * k:3 * k + 3] = A_prod
+            Gamma[3 * k:3 * k + 3] = block
+        return Phi, Gamma
+
+    def calculateControl(self, currentPose, referencePose, referenceLinearVelocity, referenceAngularVelocity,
+                         referenceDistance=0.0):
+        started = time.perf_counter_ns()
+        deadline = started + self.deadline_ns
+
+        currentTheta = (currentPose[2] + math.pi) % (2 * math.pi) - math.pi
+        referenceTheta = (referencePose[2] + math.pi) % (2 * math.pi) - math.pi
+
+        ex = referencePose[0] - currentPose[0]
+        ey = referencePose[1] - currentPose[1]
+
+        # Robot-frame errors (0-deg=Up), as in LTVUnicycleController
+        ex_robot = ex * math.sin(currentTheta) + ey * math.cos(currentTheta)
+        ey_robot = ex * math.cos(currentTheta) - ey * math.sin(currentTheta)
+
+        etheta = (referenceTheta - currentTheta + math.pi) % (2 * math.pi) - math.pi
+
+        self.last_errors = (ex_robot, ey_robot, etheta)
+
+        if abs(referenceLinearVelocity) <= 0.1:
+            # Stopped reference: the lateral error is uncontrollable over the
+            # horizon, so use the LTV law's heading-only turn instead
+            self.warm = np.zeros(2 * self.horizon)
+            return self.fallback.calculateControl(
+                currentPose, referencePose, referenceLinearVelocity, referenceAngularVelocity
+            )
+
+        # --- Build the QP: min 1/2 U'HU + g'U, lo <= U <= hi ---
+        v_ref, w_ref = self._horizon_reference(referenceDistance, referenceLinearVelocity)
+        v_ref[0] = referenceLinearVelocity
+        w_ref[0] = referenceAngularVelocity
+        Phi, Gamma = self._prediction(v_ref, w_ref)
+        e0 = np.array([ex_robot, ey_robot, etheta])
+
+        QG = self.Q_bar @ Gamma
+        H = Gamma.T @ QG + self.R_bar
+        g = QG.T @ (Phi @ e0)
+
+        # u1 = v_ref*cos(e_theta) - v, u2 = w_ref - w
+        v_nominal = v_ref.copy()
+        v_nominal[0] *= math.cos(etheta)
+        lo = np.column_stack((v_nominal - self.max_vel, w_ref - self.max_w)).ravel()
+        hi = np.column_stack((v_nominal, w_ref + self.max_w)).ravel()
+
+        # --- FISTA ---
+        step_size = 1.0 / np.linalg.eigvalsh(H)[-1]
+        # The previous solution is a close starting point: ticks are much shorter than the horizon
+        U = np.clip(self.warm, lo, hi)
+        Y = U
+        t = 1.0
+        converged = False
+        iterations = 0
+        while iterations < self.max_iterations and time.perf_counter_ns() < deadline:
+            iterations += 1
+            U_next = np.clip(Y - step_size * (H @ Y + g), lo, hi)
+            if np.max(np.abs(U_next - U)) < self.tolerance:
+                U = U_next
+                converged = True
+                break
+            t_next = 0.5 * (1.0 + math.sqrt(1.0 + 4.0 * t * t))
+            Y = U_next + ((t - 1.0) / t_next) * (U_next - U)
+            U = U_next
+            t = t_next
+
+        if iterations > 0:
+            # Stopped early, U is still feasible, just not optimal
+            if not converged:
+                self.truncated += 1
+            self.warm = U
+            v = float(v_nominal[0] - U[0])
+            w = float(w_ref[0] - U[1])
+        else:
+            self.fallbacks += 1
+            self.warm = np.zeros(2 * self.horizon)
+            v, w = self.fallback.calculateControl(
+                currentPose, referencePose, referenceLinearVelocity, referenceAngularVelocity
+            )
+
+        elapsed = (time.perf_counter_ns() - started) * 1e-9
+        self.last_solve_time = elapsed
+        self.last_iterations = iterations
+        self.solves += 1
+        self.total_solve_time += elapsed
+        self.total_iterations += iterations
+        if elapsed > self.max_solve_time:
+            self.max_solve_time = elapsed
+
+        return v, w
+
+    def summary(self):
+        solves = self.solves or 1
+        return {
+            'type': 'mpc',
+            'solves': self.solves,
+            'fallbacks': self.fallbacks,
+            'truncated': self.truncated,
+            'mean_iterations': self.total_iterations / solves,
+            'mean_solve_time': self.total_solve_time / solves,
+            'max_solve_time': self.max_solve_time,
+        }
@@ -0,0 +1,139 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+
+_CAPTURE_ID = re.compile(r'^[0-9]+-[0-9a-f]{8}$')
+
+class _CollectedStats:
+    """Stats dict from another process, in the form pstats.Stats.add accepts"""
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def profiled_call(call):
+    """Run call() under a fresh profiler; returns (result, raw stats). Used in pool processes"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = call()
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats
+
+class ProfileCapture:
+    """
+    cProfile capture of the pooled work done for one request.
+    Thread-pool calls are profiled on the worker thread that runs them;
+    process-pool calls are profiled in their process (see profiled_call) and
+    their stats added here. Work on the event loop is not profiled.
+    """
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.lock = threading.Lock() # A profiler can only be enabled on one thread at a time
+        self.profiled = False
+        self.collected = []
+
+    def call(self, call):
+        """Run call() on this thread, profiled unless another call of the request is already"""
+        if not self.lock.acquire(blocking=False):
+            return call()
+        try:
+            self.profiled = True
+            self.profiler.enable()
+            try:
+                return call()
+            finally:
+                self.profiler.disable()
+        finally:
+            self.lock.release()
+
+    def collect(self, stats):
+        """Add the raw stats a process-pool call returned"""
+        self.collected.append(stats)
+
+    def stats(self):
+        """Combined pstats.Stats of every profiled call, or None if nothing was profiled"""
+        if not self.profiled and not self.collected:
+            return None
+        stats = pstats.Stats()
+        if self.profiled:
+            stats.add(self.profiler)
+        for collected in self.collected:
+            stats.add(_CollectedStats(collected))
+        return stats
+
+class ProfileStore:
+    """
+    Directory of cProfile captures, one `<id>.prof` (pstats format) plus a
+    `<id>.json` of request metadata each. Holds at most `max_files` captures;
+    the oldest are deleted first.
+    """
+    def __init__(self, directory, max_files=50):
+        self.directory = directory
+        self.max_files = max(1, max_files)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, capture_id, ext):
+        return os.path.join(self.directory, f"{capture_id}.{ext}")
+
+    def save(self, profiler, **metadata):
+        """Write a stopped cProfile.Profile (or pstats.Stats) with its metadata; returns the capture id"""
+        capture_id = f"{time.time_ns() // 1_000_000}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(self._path(capture_id, 'prof'))
+        with open(self._path(capture_id, 'json'), 'w') as f:
+            json.dump(dict(metadata, id=capture_id), f)
+        self._evict()
+        return capture_id
+
+    def _ids(self):
+        """Capture ids, oldest first"""
+        ids = [name[:-5] for name in os.listdir(self.directory) if name.endswith('.prof')]
+        return sorted((i for i in ids if _CAPTURE_ID.match(i)), key=lambda i: int(i.split('-')[0]))
+
+    def _evict(self):
+        ids = self._ids()
+        for capture_id in ids[:max(0, len(ids) - self.max_files)]:
+            for ext in ('prof', 'json'):
+                try:
+                    os.remove(self._path(capture_id, ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        """Metadata of every capture, newest first"""
+        out = []
+        for capture_id in reversed(self._ids()):
+            try:
+                with open(self._path(capture_id, 'json')) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {'id': capture_id}
+            meta['size'] = os.path.getsize(self._path(capture_id, 'prof'))
+            out.append(meta)
+        return out
+
+    def path(self, capture_id):
+        """Path of a capture's .prof file, or None if there is no such capture"""
+        if not _CAPTURE_ID.match(capture_id):
+            return None
+        path = self._path(capture_id, 'prof')
+        return path if os.path.exists(path) else None
+
+    def report(self, capture_id, sort='cumulative', limit=50):
+        """Plain-text pstats report of a capture, or None"""
+        path = self.path(capture_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,230 @@
+import math
+import numpy as np
+from .cache import LRUCache, content_hash, register_cache
+from .controller import feedforward_angular_velocity
+
+# Most points in one grid of a ReferenceTable. Runs are cut off at 100,000
+# steps of 10 ms (see simulation.MAX_RUN_STEPS), so a finer or longer grid
+# than this would describe a routine that could never be run.
+MAX_GRID_POINTS = 100_001
+
+def _grid_points(extent, step, name):
+    """Points of a uniform grid over [0, extent] at `step`; ValueError if there would be too many"""
+    if not (math.isfinite(step) and step > 0):
+        raise ValueError(f"{name} must be a positive number")
+    if not math.isfinite(extent):
+        raise ValueError(f"The {name} grid has a non-finite extent")
+    n = max(2, int(math.ceil(extent / step)) + 1)
+    if n > MAX_GRID_POINTS:
+        raise ValueError(
+            f"The reference needs {n} points at {name}={step:g}; at most {MAX_GRID_POINTS} are allowed"
+        )
+    return n
+
+def _raw_curvature(trajectory, raw_s, thetas):
+    """
+    Per-point curvature: the trajectory's own `curvature` field when every point
+    carries one, otherwise a central difference of heading over distance.
+    Steps across duplicate points count as straight instead of dividing by zero.
+    """
+    if trajectory and all('curvature' in p for p in trajectory):
+        return np.array([p['curvature'] for p in trajectory], dtype=float)
+
+    curvature = np.zeros(len(thetas))
+    if len(thetas) > 2:
+        d_theta = thetas[2:] - thetas[:-2]
+        d_s = raw_s[2:] - raw_s[:-2]
+        moving = d_s > 1e-9
+        curvature[1:-1][moving] = d_theta[moving] / d_s[moving]
+    return curvature
+
+class ReferenceTable:
+    """
+    Trajectory and motion profile compiled into dense lookup tables.
+
+    Distance-indexed columns (x, y, theta, curvature, v, omega) live on a
+    uniform grid along the path and time-indexed columns (distance, v) on a
+    uniform time grid, so every lookup is a constant-time interpolation.
+    Theta is stored unwrapped so it interpolates cleanly across +/-pi.
+    Raises ValueError if a grid would exceed MAX_GRID_POINTS.
+    """
+    def __init__(self, trajectory, profile, spacing=0.25, time_step=0.01, curvature_smoothing=1.0):
+        self.key = None # Content hash, set when built through compile_reference
+
+        # --- Path (distance-indexed) ---
+        xs = np.array([p['x'] for p in trajectory], dtype=float)
+        ys = np.array([p['y'] for p in trajectory], dtype=float)
+        thetas = np.unwrap(np.array([p['theta'] for p in trajectory], dtype=float))
+
+        seg = np.hypot(np.diff(xs), np.diff(ys))
+        raw_s = np.concatenate(([0.0], np.cumsum(seg)))
+        self.length = float(raw_s[-1])
+
+        n = _grid_points(self.length, spacing, 'reference_spacing')
+        self.s = np.linspace(0.0, self.length, n)
+        self.ds = float(self.s[1] - self.s[0])
+        self.inv_ds = 1.0 / self.ds if self.ds > 0 else 0.0
+
+        self.x = np.interp(self.s, raw_s, xs)
+        self.y = np.interp(self.s, raw_s, ys)
+        self.theta = np.interp(self.s, raw_s, thetas)
+        raw_curvature = _raw_curvature(trajectory, raw_s, thetas)
+        self.curvature = self._smooth(np.interp(self.s, raw_s, raw_curvature), curvature_smoothing)
+
+        # --- Profile (time-indexed) ---
+        prof_t = np.array([p['time'] for p in profile], dtype=float)
+        prof_v = np.array([p['velocity'] for p in profile], dtype=float)
+        if len(profile) >= 2:
+            prof_s = np.concatenate(([0.0], np.cumsum(0.5 * (prof_v[1:] + prof_v[:-1]) * np.diff(prof_t))))
+        else:
+            prof_t = prof_v = prof_s = np.zeros(2)
+
+        self.total_time = float(prof_t[-1])
+        m = _grid_points(self.total_time, time_step, 'time_step')
+        self.t = np.linspace(0.0, self.total_time, m)
+        self.dt = float(self.t[1] - self.t[0])
+        self.inv_dt = 1.0 / self.dt if self.dt > 0 else 0.0
+        self.t_distance = np.interp(self.t, prof_t, prof_s)
+        self.t_velocity = np.interp(self.t, prof_t, prof_v)
+
+        # Planned speed by distance travelled, on its own grid since the
+        # profile's length need not match the sampled path exactly
+        self.profile_length = float(prof_s[-1])
+        k = _grid_points(self.profile_length, spacing, 'reference_spacing')
+        self.v_s = np.linspace(0.0, self.profile_length, k)
+        self.v_ds = float(self.v_s[1] - self.v_s[0])
+        self.inv_v_ds = 1.0 / self.v_ds if self.v_ds > 0 else 0.0
+        self.v_by_s = np.interp(self.v_s, prof_s, prof_v)
+
+        # Planned speed and turn rate at each path sample, zero beyond the profile
+        self.v = np.interp(self.s, prof_s, prof_v, right=0.0)
+        self.omega = feedforward_angular_velocity(self.curvature, self.v)
+
+        # Plain-float mirrors for the scalar lookups made every simulation step.
+        # Indexing Python lists avoids NumPy scalar overhead; the arrays above
+        # stay the source for vectorized use.
+        self._s = self.s.tolist()
+        self._x = self.x.tolist()
+        self._y = self.y.tolist()
+        self._theta = self.theta.tolist()
+        self._curvature = self.curvature.tolist()
+        self._v_by_s = self.v_by_s.tolist()
+        self._v = self.v.tolist()
+        self._t_distance = self.t_distance.tolist()
+        self._t_velocity = self.t_velocity.tolist()
+        self.end = (self._x[-1], self._y[-1])
+
+    def _smooth(self, column, distance):
+        """Centred moving average over `distance` of path, holding the end values"""
+        half = int(round(0.5 * distance * self.inv_ds))
+        if half < 1:
+            return column
+        kernel = np.full(2 * half + 1, 1.0 / (2 * half + 1))
+        return np.convolve(np.pad(column, half, mode='edge'), kernel, mode='valid')
+
+    @staticmethod
+    def _locate(pos, last):
+        """Split a fractional grid position into (index, fraction), clamped to the grid"""
+        if pos <= 0:
+            return 0, 0.0
+        if pos >= last:
+            return last - 1, 1.0
+        i = int(pos)
+        return i, pos - i
+
+    def _at(self, column, s):
+        i, f = self._locate(s * self.inv_ds, len(self._s) - 1)
+        return column[i] + (column[i + 1] - column[i]) * f
+
+    def distance_of(self, index):
+        """Distance along the path of grid sample `index`"""
+        return self._s[index]
+
+    def point(self, index):
+        """(x, y, theta) of grid sample `index`"""
+        return self._x[index], self._y[index], self._theta[index]
+
+    def pose_at(self, s):
+        """Reference (x, y, theta) at distance s along the path"""
+        i, f = self._locate(s * self.inv_ds, len(self._s) - 1)
+        x, y, theta = self._x, self._y, self._theta
+        return (
+            x[i] + (x[i + 1] - x[i]) * f,
+            y[i] + (y[i + 1] - y[i]) * f,
+            theta[i] + (theta[i + 1] - theta[i]) * f
+        )
+
+    def velocity_at(self, s):
+        """Planned speed once distance s has been travelled (0 past the end of the profile)"""
+        if s >= self.profile_length:
+            return 0.0
+        i, f = self._locate(s * self.inv_v_ds, len(self._v_by_s) - 1)
+        v = self._v_by_s
+        return v[i] + (v[i + 1] - v[i]) * f
+
+    def speed_at(self, s):
+        """Planned speed at distance s along the path (0 beyond the end of the profile)"""
+        return self._at(self._v, s)
+
+    def curvature_at(self, s):
+        """Smoothed path curvature (dtheta/ds) at s"""
+        return self._at(self._curvature, s)
+
+    def omega_at(self, s, v):
+        """
+        Feedforward angular velocity for speed v at distance s.
+        Accepts arrays of s and v for batch evaluation.
+        """
+        if np.ndim(s) == 0:
+            return feedforward_angular_velocity(self._at(self._curvature, s), v)
+        return feedforward_angular_velocity(np.interp(s, self.s, self.curvature), v)
+
+    def distance_at_time(self, t):
+        """Planned distance along the path at time t"""
+        i, f = self._locate(t * self.inv_dt, len(self._t_distance) - 1)
+        d = self._t_distance
+        return d[i] + (d[i + 1] - d[i]) * f
+
+    def sample_time(self, t):
+        """Planned (x, y, theta, v, omega) at time t"""
+        i, f = self._locate(t * self.inv_dt, len(self._t_distance) - 1)
+        d, vel = self._t_distance, self._t_velocity
+        s = d[i] + (d[i + 1] - d[i]) * f
+        v = vel[i] + (vel[i + 1] - vel[i]) * f
+        x, y, theta = self.pose_at(s)
+        return x, y, theta, v, self.omega_at(s, v)
+
+    def sample_times(self, t):
+        """Vectorized sample_time: planned (x, y, theta, v, omega) arrays at the times in t"""
+        s = np.interp(t, self.t, self.t_distance)
+        v = np.interp(t, self.t, self.t_velocity)
+        x = np.interp(s, self.s, self.x)
+        y = np.interp(s, self.s, self.y)
+        theta = np.interp(s, self.s, self.theta)
+        return x, y, theta, v, self.omega_at(s, v)
+
+    def closest(self, x, y, near=None, window=None):
+        """
+        Grid index of the path sample closest to (x, y).
+        With `near` set, only samples within `window` indices of it are searched,
+        which keeps the cost constant and stops the match jumping across crossings.
+        """
+        lo, hi = 0, len(self.s)
+        if near is not None and window is not None:
+            lo = max(0, near - window)
+            hi = min(hi, near + window + 1)
+        dx = self.x[lo:hi] - x
+        dy = self.y[lo:hi] - y
+        return lo + int(np.argmin(dx * dx + dy * dy))
+
+_compiled = register_cache('reference', LRUCache(max_items=16))
+
+def compile_reference(trajectory, profile, spacing=0.25, curvature_smoothing=1.0):
+    """Build (or reuse) the ReferenceTable for a trajectory/profile pair"""
+    key = content_hash(trajectory, profile, spacing, curvature_smoothing)
+    table = _compiled.get(key)
+    if table is None:
+        table = ReferenceTable(trajectory, profile, spacing=spacing, curvature_smoothing=curvature_smoothing)
+        table.key = key
+        _compiled.put(key, table)
+    return table
@@ -0,0 +1,159 @@
+"""
+Binary robot path format ("RPTH").
+
+Layout, all little-endian:
+
+    0   4 bytes   magic b'RPTH'
+    4   uint16    format version
+    6   uint16    flags (reserved, 0)
+    8   uint32    header length in bytes
+    12  header    UTF-8 JSON, space-padded so the data starts 16-byte aligned
+        data      one contiguous block per column
+
+The header carries the v1.2 metadata, control points, action points and
+motion profile settings, plus a `columns` table: for each of `trajectory` and
+`profile`, a list of {name, dtype, encoding, offset, count}, with offsets
+relative to the start of the data. An optional `setpoints` group (t, x, y,
+theta, v, omega) holds a uniformly time-sampled setpoint table. Columns are
+float32 with encoding `raw`, the values themselves; the columns of a group all
+have the same count.
+
+This module only needs NumPy, so it can be copied to the robot as is.
+"""
+import json
+import struct
+import numpy as np
+
+MAGIC = b'RPTH'
+FORMAT_VERSION = 1
+ALIGNMENT = 16
+
+TRAJECTORY_COLUMNS = ('x', 'y', 'theta', 'distance', 'velocity', 'curvature')
+PROFILE_COLUMNS = ('time', 'velocity', 'acceleration', 'jerk')
+SETPOINT_COLUMNS = ('t', 'x', 'y', 'theta', 'v', 'omega')
+
+_PREAMBLE = struct.Struct('<4sHHI')
+
+def _point_columns(points, names):
+    return {name: np.array([float(p.get(name, 0.0)) for p in points], dtype=float) for name in names}
+
+def dumps(document, setpoints=None):
+    """
+    Encode a v1.2 path document (the dict the legacy save_path_to_file wrote)
+    into the binary format. `setpoints` is an optional {name: array} table in
+    SETPOINT_COLUMNS.
+    """
+    profile_settings = dict(document.get('motion_profile') or {})
+    groups = {
+        'trajectory': _point_columns(document.get('trajectory') or [], TRAJECTORY_COLUMNS),
+        'profile': _point_columns(profile_settings.pop('profile_points', None) or [], PROFILE_COLUMNS),
+    }
+    if setpoints is not None:
+        groups['setpoints'] = {name: np.asarray(setpoints[name], dtype=float) for name in SETPOINT_COLUMNS}
+
+    blocks, table, offset = [], {}, 0
+    for group, columns in groups.items():
+        table[group] = []
+        for name, values in columns.items():
+            data = values.astype('<f4')
+            table[group].append({
+                'name': name, 'dtype': '<f4', 'encoding': 'raw', 'offset': offset, 'count': len(values),
+            })
+            blocks.append(data.tobytes())
+            offset += data.nbytes
+
+    header = json.dumps({
+        'metadata': document.get('metadata', {}),
+        'control_points': document.get('control_points', []),
+        'action_points': document.get('action_points', {}),
+        'motion_profile': profile_settings,
+        'columns': table,
+    }, separators=(',', ':')).encode()
+    header += b' ' * (-(_PREAMBLE.size + len(header)) % ALIGNMENT)
+    return _PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header)) + header + b''.join(blocks)
+
+def _field(header, name, kind, default):
+    value = header.get(name, default)
+    if not isinstance(value, kind):
+        raise ValueError(f"Robot path header field '{name}' must be {'an object' if kind is dict else 'a list'}")
+    return value
+
+def _count(column, name):
+    value = column.get(name)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"Robot path column {name} must be a non-negative integer")
+    return value
+
+class RobotPath:
+    """
+    A decoded file. `trajectory`, `profile` and `setpoints` (empty unless the
+    file has a setpoint table) map column names to read-only float32 views
+    into the file. Malformed files raise ValueError.
+    """
+    def __init__(self, buffer):
+        if len(buffer) < _PREAMBLE.size:
+            raise ValueError("Not a robot path file (too short)")
+        magic, version, _flags, header_len = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a robot path file (bad magic)")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Robot path format version {version} is newer than supported ({FORMAT_VERSION})")
+        start = _PREAMBLE.size + header_len
+        if start > len(buffer):
+            raise ValueError("Truncated robot path header")
+        header = json.loads(bytes(buffer[_PREAMBLE.size:start]))
+        if not isinstance(header, dict):
+            raise ValueError("Robot path header must be a JSON object")
+
+        self.version = version
+        self.metadata = _field(header, 'metadata', dict, {})
+        self.control_points = _field(header, 'control_points', list, [])
+        self.action_points = _field(header, 'action_points', dict, {})
+        self.motion_profile = _field(header, 'motion_profile', dict, {})
+        self.trajectory = {}
+        self.profile = {}
+        self.setpoints = {}
+        groups = {'trajectory': self.trajectory, 'profile': self.profile, 'setpoints': self.setpoints}
+        for group, columns in _field(header, 'columns', dict, {}).items():
+            target = groups.get(group)
+            if target is None:
+                continue # Unknown groups from newer writers are skipped
+            if not isinstance(columns, list) or not all(isinstance(c, dict) for c in columns):
+                raise ValueError(f"Robot path column group '{group}' must be a list of objects")
+            for column in columns:
+                name = column.get('name')
+                if not isinstance(name, str):
+                    raise ValueError(f"Robot path column in '{group}' has no name")
+                if column.get('dtype') != '<f4' or column.get('encoding') != 'raw':
+                    raise ValueError(f"Robot path column {group}.{name} must be raw '<f4'")
+                offset = start + _count(column, 'offset')
+                count = _count(column, 'count')
+                if offset + count * 4 > len(buffer):
+                    raise ValueError(f"Truncated robot path column {group}.{name}")
+                target[name] = np.frombuffer(buffer, dtype='<f4', count=count, offset=offset)
+            if len({len(values) for values in target.values()}) > 1:
+                raise ValueError(f"Robot path columns of '{group}' differ in length")
+
+    def __len__(self):
+        return len(next(iter(self.trajectory.values()), ()))
+
+    def to_document(self):
+        """The equivalent v1.2 path document, with per-point dicts"""
+        def points(columns):
+            names = list(columns)
+            return [dict(zip(names, row)) for row in zip(*(columns[n].tolist() for n in names))]
+        return {
+            'metadata': dict(self.metadata),
+            'control_points': list(self.control_points),
+            'action_points': dict(self.action_points),
+            'trajectory': points(self.trajectory),
+            'motion_profile': dict(self.motion_profile, profile_points=points(self.profile)),
+        }
+
+def loads(data):
+    """Decode bytes (or any buffer); raw columns are views into it, not copies"""
+    return RobotPath(data)
+
+def load(path):
+    """Memory-map a file and decode it; raw columns are read from the mapping on access"""
+    return RobotPath(np.memmap(path, dtype=np.uint8, mode='r'))
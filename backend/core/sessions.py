@@ -0,0 +1,271 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+from .simulation import SimState, Simulation
+from .reference import ReferenceTable
+from .controller import LTVUnicycleController
+from .lqr import GainTable, LQRController
+from .mpc import MPCController
+from .tracking import ErrorStats, TrackingStats
+
+DEFAULT_SESSION = 'default'
+
+class MemorySessionStore:
+    """
+    Simulations held in this process, keyed by session id. Only correct with a
+    single server worker; the least recently used beyond `limit` are dropped.
+    """
+    def __init__(self, limit=64):
+        self.limit = max(1, limit)
+        self.sessions = OrderedDict() # id -> (Simulation, lock)
+        self.lock = threading.Lock()
+
+    def _entry(self, session_id):
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                entry = self.sessions[session_id] = (Simulation(), threading.Lock())
+                while len(self.sessions) > self.limit:
+                    self.sessions.popitem(last=False)
+            self.sessions.move_to_end(session_id)
+            return entry
+
+    def start(self, session_id, trajectory, profile, path_length, params, start_pose):
+        self.call(session_id, lambda sim: sim.start(trajectory, profile, path_length, params, start_pose))
+
+    def call(self, session_id, fn, write=True):
+        """fn(sim) for the session's Simulation, with the session locked"""
+        sim, lock = self._entry(session_id)
+        with lock:
+            return fn(sim)
+
+    def reset(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def active(self):
+        with self.lock:
+            return sum(1 for sim, _ in self.sessions.values() if sim.is_running)
+
+# --- SQLite ---
+
+# Session state is stored as JSON, never pickled: the database file may be
+# shared, and unpickling its contents could run arbitrary code. Only the
+# classes below are rebuilt from it, by setting their fields directly.
+_STATE_TYPES = {cls.__name__: cls for cls in (
+    SimState, TrackingStats, ErrorStats, LTVUnicycleController, LQRController, MPCController
+)}
+# Compiled tables are stored by name; they are rebuilt from the start spec instead
+_TABLE_TYPES = (ReferenceTable, GainTable)
+
+def _encode(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {'tuple': [_encode(v) for v in value]}
+    if isinstance(value, dict):
+        return {'dict': {str(k): _encode(v) for k, v in value.items()}}
+    if isinstance(value, np.ndarray):
+        return {'ndarray': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, _TABLE_TYPES):
+        return {'table': type(value).__name__}
+    cls = type(value)
+    if _STATE_TYPES.get(cls.__name__) is cls:
+        names = cls.__slots__ if hasattr(cls, '__slots__') else vars(value)
+        return {'object': cls.__name__, 'fields': {name: _encode(getattr(value, name)) for name in names}}
+    raise TypeError(f"Cannot store a {cls.__name__} in a session")
+
+def _decode(value, sim):
+    if not isinstance(value, (list, dict)):
+        return value
+    if isinstance(value, list):
+        return [_decode(v, sim) for v in value]
+    if 'tuple' in value:
+        return tuple(_decode(v, sim) for v in value['tuple'])
+    if 'dict' in value:
+        return {k: _decode(v, sim) for k, v in value['dict'].items()}
+    if 'ndarray' in value:
+        return np.array(value['ndarray'], dtype=np.dtype(value['dtype']))
+    if 'table' in value:
+        if value['table'] == 'ReferenceTable':
+            return sim.reference
+        if value['table'] == 'GainTable':
+            return sim.controller.table
+        raise ValueError(f"Unknown table {value['table']!r} in session state")
+    cls = _STATE_TYPES.get(value.get('object'))
+    if cls is None:
+        raise ValueError(f"Unknown object {value.get('object')!r} in session state")
+    obj = cls.__new__(cls)
+    for name, field in value['fields'].items():
+        setattr(obj, name, _decode(field, sim))
+    return obj
+
+def _dump_state(sim):
+    return json.dumps(_encode({
+        'snapshot': sim.snapshot(),
+        'dt': sim.dt,
+        'next_snapshot_time': sim.next_snapshot_time,
+    }), separators=(',', ':'))
+
+def _load_state(sim, text):
+    state = _decode(json.loads(text), sim)
+    sim.restore(state['snapshot'])
+    sim.dt = state['dt']
+    sim.next_snapshot_time = state['next_snapshot_time']
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite database shared by every worker process on the host.
+
+    A row holds the run's start spec and a snapshot of its latest state,
+    versioned on every write. Each process keeps the Simulations it has used:
+    if the row's version still matches, the local object is used as is;
+    otherwise it is restarted from the spec (the reference table comes from the
+    per-process cache) and restored from the snapshot. Writes hold the
+    database's write lock, so a session is advanced by one worker at a time.
+
+    Telemetry and seek snapshots live in the process that recorded them;
+    seeking in a process that did not run the steps replays from the start.
+    Each process keeps at most `limit` local Simulations, least recently used
+    dropped first, and forgets those whose rows have expired.
+    """
+    def __init__(self, path, ttl=3600.0, limit=64):
+        self.path = path
+        self.ttl = ttl
+        self.limit = max(1, limit)
+        self.local = OrderedDict() # id -> (start_id, version, Simulation)
+        # Sessions hash onto a fixed set of locks, so there is nothing to evict
+        self.locks = [threading.Lock() for _ in range(64)]
+        self.lock = threading.Lock()
+        self.connections = threading.local()
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                start_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                spec TEXT NOT NULL,
+                state TEXT NOT NULL,
+                running INTEGER NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+
+    def _connection(self):
+        conn = getattr(self.connections, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.connections.conn = conn
+        return conn
+
+    def _session_lock(self, session_id):
+        return self.locks[hash(session_id) % len(self.locks)]
+
+    def _remember(self, session_id, entry):
+        with self.lock:
+            self.local[session_id] = entry
+            self.local.move_to_end(session_id)
+            while len(self.local) > self.limit:
+                self.local.popitem(last=False)
+
+    def _forget(self, *session_ids):
+        with self.lock:
+            for session_id in session_ids:
+                self.local.pop(session_id, None)
+
+    def _materialize(self, session_id, row):
+        """The local Simulation brought up to the stored row"""
+        if row is None:
+            self._forget(session_id)
+            return Simulation()
+        start_id, version, spec, state = row
+        with self.lock:
+            cached = self.local.get(session_id)
+        if cached is not None and cached[0] == start_id and cached[1] == version:
+            return cached[2]
+        if cached is not None and cached[0] == start_id:
+            sim = cached[2]
+        else:
+            sim = Simulation()
+            sim.start(*json.loads(spec))
+        # Rows from versions that pickled the state are never unpickled; they restart from the spec
+        if isinstance(state, str):
+            _load_state(sim, state)
+        self._remember(session_id, (start_id, version, sim))
+        return sim
+
+    def _write(self, conn, session_id, start_id, version, spec, sim):
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (id, start_id, version, spec, state, running, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (session_id, start_id, version, spec, _dump_state(sim), int(sim.is_running), time.time())
+        )
+        self._remember(session_id, (start_id, version, sim))
+
+    def start(self, session_id, trajectory, profile, path_length, params, start_pose):
+        spec = json.dumps([trajectory, profile, path_length, params, start_pose])
+        sim = Simulation()
+        sim.start(trajectory, profile, path_length, params, start_pose)
+        with self._session_lock(session_id):
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cutoff = time.time() - self.ttl
+                expired = conn.execute("SELECT id FROM sessions WHERE updated < ?", (cutoff,)).fetchall()
+                conn.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,))
+                self._forget(*(row[0] for row in expired))
+                self._write(conn, session_id, uuid.uuid4().hex, 1, spec, sim)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._forget(session_id)
+                raise
+
+    def call(self, session_id, fn, write=True):
+        """fn(sim) for the session's Simulation; with write, the new state is stored"""
+        with self._session_lock(session_id):
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                row = conn.execute(
+                    "SELECT start_id, version, spec, state FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                sim = self._materialize(session_id, row)
+                result = fn(sim)
+                if write and row is not None:
+                    self._write(conn, session_id, row[0], row[1] + 1, row[2], sim)
+                conn.execute("COMMIT")
+                return result
+            except BaseException:
+                conn.execute("ROLLBACK")
+                # The local object may be half-updated; rebuild it next time
+                self._forget(session_id)
+                raise
+
+    def reset(self, session_id):
+        with self._session_lock(session_id):
+            self._connection().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._forget(session_id)
+
+    def active(self):
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE running = 1 AND updated >= ?", (time.time() - self.ttl,)
+        ).fetchone()
+        return row[0]
+
+def make_session_store(kind='memory', path='sessions.db', ttl=3600.0, limit=64):
+    if kind == 'memory':
+        return MemorySessionStore(limit=limit)
+    if kind == 'sqlite':
+        return SQLiteSessionStore(path, ttl=ttl, limit=limit)
+    raise ValueError(f"Unknown session store '{kind}'. Expected 'memory' or 'sqlite'")
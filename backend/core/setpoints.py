@@ -0,0 +1,21 @@
+import math
+import numpy as np
+
+SETPOINT_FIELDS = ('t', 'x', 'y', 'theta', 'v', 'omega')
+MIN_RATE = 50.0
+MAX_RATE = 1000.0
+
+def setpoint_table(reference, rate):
+    """
+    The planned motion sampled every 1/rate seconds, from t = 0 until the
+    first sample at or past the end of the profile (which holds the final
+    setpoint). Returns {field: float64 array} in SETPOINT_FIELDS order; theta
+    is wrapped to [-pi, pi) like the trajectory's.
+    """
+    if not MIN_RATE <= rate <= MAX_RATE:
+        raise ValueError(f"rate must be between {MIN_RATE:g} and {MAX_RATE:g} Hz")
+    count = int(math.ceil(reference.total_time * rate - 1e-9)) + 1
+    t = np.arange(count) / rate
+    x, y, theta, v, omega = reference.sample_times(t)
+    theta = np.mod(theta + math.pi, 2 * math.pi) - math.pi
+    return dict(zip(SETPOINT_FIELDS, (t, x, y, theta, v, omega)))
@@ -1,29 +1,104 @@
+import copy
+import hashlib
 import math
+import sys
 import numpy as np
-from .controller import LTVUnicycleController
-from .motion import get_velocity_at_distance
+from .controller import LTVUnicycleController, feedforward_angular_velocity
+from .lqr import LQRController, compile_gain_table
+from .mpc import MPCController
+from .kinematics import get_integrator
+from .reference import compile_reference
+from .telemetry import TelemetryRecorder
+from .tracking import TrackingStats
+from .snapshots import SnapshotBuffer
+from .timing import StageTimer, perf_counter_ns
+from . import controller, kinematics, lqr, mpc, reference, snapshots, telemetry, tracking
 
-class Simulation:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self):
-        self.robot_pose = np.array([0.0, 0.0, 0.0])
+# Most steps one headless run may take; bounds its telemetry buffer and run time
+MAX_RUN_STEPS = 100_000
+
+def run_horizon(total_time):
+    """Time at which runs that never finish are cut off: twice the profile time plus 5 s"""
+    return 2 * total_time + 5.0
+
+def run_steps(dt, max_time):
+    """Steps a run of max_time seconds takes at dt; ValueError if not positive or over MAX_RUN_STEPS"""
+    if dt <= 0:
+        raise ValueError("dt must be > 0")
+    if max_time <= 0:
+        raise ValueError("max_time must be > 0")
+    steps = int(math.ceil(max_time / dt))
+    if steps > MAX_RUN_STEPS:
+        raise ValueError(f"A run of {max_time:g} s at dt={dt:g} takes {steps} steps; at most {MAX_RUN_STEPS} are allowed")
+    return steps
+
+def _source_hash(*modules):
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+# Changes with the source of the simulator and its controllers; part of the key of cached runs
+ENGINE_VERSION = _source_hash(
+    sys.modules[__name__], controller, kinematics, lqr, mpc, reference, snapshots, telemetry, tracking
+)
+
+class SimState:
+    """
+    Robot state advanced by Simulation.step. Plain Python floats only: scalar
+    math on them skips the NumPy dispatch cost paid on 3-element arrays.
+    """
+    __slots__ = (
+        'x', 'y', 'theta',
+        'velocity', 'acceleration', 'jerk',
+        'prev_velocity', 'prev_acceleration',
+        'time', 'distance_traveled'
+    )
+    
+    def __init__(self, x=0.0, y=0.0, theta=0.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.theta = float(theta)
         self.velocity = 0.0
         self.acceleration = 0.0
         self.jerk = 0.0
         self.prev_velocity = 0.0
         self.prev_acceleration = 0.0
-        
         self.time = 0.0
         self.distance_traveled = 0.0
+    
+    def copy(self):
+        other = SimState.__new__(SimState)
+        for name in SimState.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+class Simulation:
+    def __init__(self):
+        self.telemetry = None
+        self.reset()
+        
+    def reset(self):
+        self.state = SimState()
+        self.stats = TrackingStats()
+        self.snapshots = SnapshotBuffer()
+        self.next_snapshot_time = 0.0
+        self.dt = 0.01
+        if self.telemetry is not None:
+            self.telemetry.clear()
         
         self.is_running = False
         self.controller = None
+        self.disturbance = None
         self.trajectory = []
         self.path_length = 0.0
         self.total_time = 0.0
         self.generated_profile = []
+        self.reference = None
+        self.closest_idx = None
+        self.search_window = None
+        self.timer = None
         
         self.params = {
             'max_vel': 60.0,
@@ -31,10 +106,46 @@ class Simulation:
             'max_angular_vel': 3.0,
             'field_min': -72,
             'field_max': 72,
-            'robot_radius': 8
+            'robot_radius': 8,
+            'reference_spacing': 0.25,   # Grid spacing of the compiled reference table
+            'search_window': 12.0,       # Distance either side of the last closest point to search
+            'curvature_smoothing': 1.0,  # Moving-average length applied to path curvature
+            'integrator': 'euler',       # 'euler', 'exact' or 'rk4'
+            'substeps': 1,               # Physics steps per controller step
+            'telemetry': False,          # Record every step into a ring buffer
+            'telemetry_capacity': 30000, # Most rows kept (5 min at 10 ms)
+            'snapshot_interval': 0.25,   # Seconds between snapshots for seek/rewind (0 disables)
+            'snapshot_limit': 2400,      # Snapshots kept besides the start one
+            'timing': False,             # Per-stage step timing histograms
+            'controller': 'ltv',         # 'ltv' (fixed gains), 'lqr' (gain-scheduled) or 'mpc'
+            'lqr_q': [0.25, 25.0, 16.0], # LQR state weights: forward, lateral, heading error
+            'lqr_r': [0.5, 36.0],        # LQR input weights: linear, angular velocity
+            'lqr_spacing': 1.0,          # Distance between entries of the LQR gain table
+            'lqr_min_velocity': 1.0,     # Speed floor for the gain solve
+            'mpc_q': [2.25, 9.0, 1.0],   # MPC state weights: forward, lateral, heading error
+            'mpc_r': [0.05, 0.5],        # MPC input weights: linear, angular velocity
+            'mpc_horizon': 10,           # Prediction steps
+            'mpc_step': 0.05,            # Seconds between prediction steps
+            'mpc_deadline': 0.005,       # Seconds each solve may take; keep below the step dt
+            'mpc_max_iterations': 100    # Solver iterations per tick; the last iterate is used if not converged
         }
+        self._apply_params()
+        
+    def _apply_params(self):
+        """Resolve the params read every step into attributes, once"""
+        self.integrate = get_integrator(self.params['integrator'])
+        self.substeps = max(1, int(self.params['substeps']))
+        self.max_vel = float(self.params['max_vel'])
+        self.max_accel = float(self.params['max_accel'])
+        self.max_w = float(self.params['max_angular_vel'])
+        self.field_lo = float(self.params['field_min'] + self.params['robot_radius'])
+        self.field_hi = float(self.params['field_max'] - self.params['robot_radius'])
         
-    def start(self, trajectory, profile, path_length, params, start_pose):
+    def start(self, trajectory, profile, path_length, params, start_pose, reference=None):
+        """
+        Start a run. The trajectory and profile are compiled once into a
+        ReferenceTable (cached per content); pass `reference` to reuse one directly.
+        """
         self.reset()
         self.trajectory = trajectory
         self.generated_profile = profile
@@ -43,137 +154,390 @@ class Simulation:
             self.total_time = profile[-1]['time']
             
         self.params.update(params)
+        self._apply_params()
+        
+        if self.params['telemetry']:
+            requested = self.params['telemetry_capacity']
+            if isinstance(requested, bool) or not (isinstance(requested, (int, float)) and requested >= 1):
+                raise ValueError("telemetry_capacity must be a positive number")
+            # Room for the whole run horizon at the step dt, up to telemetry_capacity;
+            # no run has more than MAX_RUN_STEPS steps to record
+            rows = int(math.ceil(min(self.horizon() / self.dt, MAX_RUN_STEPS))) + 1
+            capacity = int(min(requested, rows))
+            if self.telemetry is None or self.telemetry.capacity != capacity:
+                self.telemetry = TelemetryRecorder(capacity)
+        else:
+            self.telemetry = None
+        
+        self.timer = StageTimer() if self.params['timing'] else None
+        
+        if reference is None and trajectory:
+            reference = compile_reference(
+                trajectory, profile,
+                spacing=self.params['reference_spacing'],
+                curvature_smoothing=self.params['curvature_smoothing']
+            )
+        self.reference = reference
+        if reference is not None:
+            self.search_window = int(self.params['search_window'] * reference.inv_ds) + 1
         
         # Initialize controller
-        self.controller = LTVUnicycleController(
-            kx=params.get('kx', 1.5), 
-            ky=params.get('ky', 3.0),
-            ktheta=params.get('ktheta', 2.0)
-        )
+        controller = self.params['controller']
+        if controller == 'ltv':
+            self.controller = LTVUnicycleController(
+                kx=params.get('kx', 1.5), 
+                ky=params.get('ky', 3.0),
+                ktheta=params.get('ktheta', 2.0)
+            )
+        elif controller == 'lqr':
+            if reference is None:
+                raise ValueError("The 'lqr' controller needs a trajectory")
+            self.controller = LQRController(compile_gain_table(
+                reference,
+                q=self.params['lqr_q'],
+                r=self.params['lqr_r'],
+                spacing=self.params['lqr_spacing'],
+                min_velocity=self.params['lqr_min_velocity']
+            ))
+        elif controller == 'mpc':
+            if reference is None:
+                raise ValueError("The 'mpc' controller needs a trajectory")
+            if not self.params['mpc_deadline'] > 0:
+                raise ValueError("mpc_deadline must be > 0")
+            self.controller = MPCController(
+                reference,
+                fallback=LTVUnicycleController(
+                    kx=params.get('kx', 1.5),
+                    ky=params.get('ky', 3.0),
+                    ktheta=params.get('ktheta', 2.0)
+                ),
+                q=self.params['mpc_q'],
+                r=self.params['mpc_r'],
+                horizon=self.params['mpc_horizon'],
+                step=self.params['mpc_step'],
+                max_vel=self.max_vel,
+                max_w=self.max_w,
+                deadline=self.params['mpc_deadline'],
+                max_iterations=self.params['mpc_max_iterations']
+            )
+        else:
+            raise ValueError(f"Unknown controller '{controller}'. Expected 'ltv', 'lqr' or 'mpc'")
         
-        self.robot_pose = np.array(start_pose)
+        self.state = SimState(*start_pose)
         self.is_running = True
         
+        self.snapshots = SnapshotBuffer(int(self.params['snapshot_limit']) + 1)
+        if self.params['snapshot_interval'] > 0:
+            self.snapshots.add(self.snapshot())
+            self.next_snapshot_time = self.params['snapshot_interval']
+        
+    # Read-only views of the state, kept for callers of the old attributes
+    @property
+    def robot_pose(self):
+        return np.array([self.state.x, self.state.y, self.state.theta])
+    
+    @property
+    def velocity(self):
+        return self.state.velocity
+    
+    @property
+    def acceleration(self):
+        return self.state.acceleration
+    
+    @property
+    def jerk(self):
+        return self.state.jerk
+    
+    @property
+    def time(self):
+        return self.state.time
+    
+    @property
+    def distance_traveled(self):
+        return self.state.distance_traveled
+
+    def horizon(self):
+        """Time at which runs that never finish are cut off (see run_horizon)"""
+        return run_horizon(self.total_time)
+        
     def step(self, dt=0.01):
-        if not self.is_running or not self.trajectory:
+        if not self.is_running or self.reference is None:
             return None
         
+        ref = self.reference
+        state = self.state
+        params = self.params
+        timer = self.timer
+        if timer is not None:
+            t0 = perf_counter_ns()
+        
         # 1. Target Velocity
-        target_velocity = get_velocity_at_distance(self.distance_traveled, self.path_length, self.total_time, self.generated_profile)
+        target_velocity = ref.velocity_at(state.distance_traveled)
+        if timer is not None:
+            t1 = perf_counter_ns()
+            timer.add('profile', t1 - t0)
         
         # 2. Find Closest Point
-        min_dist = float('inf')
-        closest_idx = 0
-        for i, pt in enumerate(self.trajectory):
-            dist = math.hypot(pt['x'] - self.robot_pose[0], pt['y'] - self.robot_pose[1])
-            if dist < min_dist:
-                min_dist = dist
-                closest_idx = i
+        # Global search on the first step, then only near the previous match
+        self.closest_idx = ref.closest(state.x, state.y, self.closest_idx, self.search_window)
+        closest_s = ref.distance_of(self.closest_idx)
+        
+        # Tracking errors against the closest path point
+        path_x, path_y, path_theta = ref.point(self.closest_idx)
+        cross_track = (state.x - path_x) * math.cos(path_theta) - (state.y - path_y) * math.sin(path_theta)
+        along_track = closest_s - ref.distance_at_time(state.time)
+        heading_error = (state.theta - path_theta + math.pi) % (2 * math.pi) - math.pi
+        if timer is not None:
+            t0 = perf_counter_ns()
+            timer.add('closest', t0 - t1)
                 
         # 3. Lookahead
         # Define a fixed lookahead distance (e.g., 15 units or dynamic based on velocity)
         # A common heuristic: lookahead = min_lookahead + k * velocity
-        min_lookahead = self.params.get('min_lookahead', 10.0)
-        lookahead_gain = self.params.get('lookahead_gain', 0.1)
+        min_lookahead = params.get('min_lookahead', 10.0)
+        lookahead_gain = params.get('lookahead_gain', 0.1)
         lookahead_distance = min_lookahead + (lookahead_gain * target_velocity)
         
-        current_lookahead = 0.0
-        target_idx = closest_idx
+        ref_s = closest_s + lookahead_distance
+        ref_x, ref_y, ref_theta = ref.pose_at(ref_s)
         
-        # Iterate forward until we accumulate enough distance
-        while target_idx < len(self.trajectory) - 1:
-            if current_lookahead >= lookahead_distance:
-                break
-                
-            # Distance between current target point and next point
-            curr_pt = self.trajectory[target_idx]
-            next_pt = self.trajectory[target_idx + 1]
-            segment_dist = math.hypot(next_pt['x'] - curr_pt['x'], next_pt['y'] - curr_pt['y'])
-            
-            current_lookahead += segment_dist
-            target_idx += 1
-        
-        ref_point = self.trajectory[target_idx]
-        
-        # 4. Reference Angular Velocity
-        if target_idx < len(self.trajectory) - 1:
-            next_point = self.trajectory[min(target_idx + 1, len(self.trajectory) - 1)]
-            angle_diff = (next_point['theta'] - ref_point['theta'] + math.pi) % (2 * math.pi) - math.pi
-            dist = math.hypot(next_point['x'] - ref_point['x'], next_point['y'] - ref_point['y'])
-            referenceW = (angle_diff / dist) * target_velocity
-        else:
-            referenceW = 0
+        # 4. Reference Angular Velocity (curvature feedforward)
+        referenceW = feedforward_angular_velocity(ref.curvature_at(ref_s), target_velocity)
         
-        max_w = self.params['max_angular_vel']
-        referenceW = np.clip(referenceW, -max_w, max_w)
+        max_w = self.max_w
+        referenceW = min(max(referenceW, -max_w), max_w)
+        if timer is not None:
+            t1 = perf_counter_ns()
+            timer.add('lookahead', t1 - t0)
         
         # 5. Controller Output
-        v, w = self.controller.calculateControl(
-            self.robot_pose,
-            [ref_point['x'], ref_point['y'], ref_point['theta']],
+        v, w_cmd = self.controller.calculateControl(
+            (state.x, state.y, state.theta),
+            (ref_x, ref_y, ref_theta),
             target_velocity,
-            referenceW
+            referenceW,
+            referenceDistance=ref_s
         )
+        if timer is not None:
+            t0 = perf_counter_ns()
+            timer.add('controller', t0 - t1)
         
         # 6. Dynamics (Acceleration Limit)
-        max_accel = self.params['max_accel']
         desired_velocity = v
-        velocity_error = desired_velocity - self.velocity
-        max_accel_step = max_accel * dt
+        velocity_error = desired_velocity - state.velocity
+        max_accel_step = self.max_accel * dt
+        accel_saturated = False
         
         if velocity_error > max_accel_step:
             velocity_error = max_accel_step
+            accel_saturated = True
         elif velocity_error < -max_accel_step:
             velocity_error = -max_accel_step
+            accel_saturated = True
             
-        self.velocity += velocity_error
-        self.velocity = np.clip(self.velocity, 0, self.params['max_vel'])
+        velocity = min(max(state.velocity + velocity_error, 0.0), self.max_vel)
+        state.velocity = velocity
         
         # 7. Kinematics Update
-        # 0-deg=Up System
-        deltaX = self.velocity * math.sin(self.robot_pose[2]) * dt
-        deltaY = self.velocity * math.cos(self.robot_pose[2]) * dt
+        w = min(max(w_cmd, -max_w), max_w)
+        self.stats.update(cross_track, along_track, heading_error, w != w_cmd, accel_saturated)
         
-        w = np.clip(w, -max_w, max_w)
+        # Disturbances act on the robot's motion, not on the commanded state
+        applied_velocity = velocity
+        if self.disturbance is not None:
+            applied_velocity, w = self.disturbance.apply(applied_velocity, w)
         
-        self.robot_pose[0] += deltaX
-        self.robot_pose[1] += deltaY
-        self.robot_pose[2] = (self.robot_pose[2] + (w * dt)) % (2 * math.pi)
+        # 0-deg=Up System. The controller output is held for the whole step while
+        # the physics runs at dt / substeps, clamping to the field every substep.
+        rmin = self.field_lo
+        rmax = self.field_hi
+        x, y, theta = state.x, state.y, state.theta
+        physics_dt = dt / self.substeps
+        for _ in range(self.substeps):
+            x, y, theta = self.integrate(x, y, theta, applied_velocity, w, physics_dt)
+            x = min(max(x, rmin), rmax)
+            y = min(max(y, rmin), rmax)
         
-        # Clamp to field
-        rmin = self.params['field_min'] + self.params['robot_radius']
-        rmax = self.params['field_max'] - self.params['robot_radius']
-        self.robot_pose[0] = np.clip(self.robot_pose[0], rmin, rmax)
-        self.robot_pose[1] = np.clip(self.robot_pose[1], rmin, rmax)
+        state.x = x
+        state.y = y
+        state.theta = theta % (2 * math.pi)
         
         # 8. Update State
-        new_acceleration = (self.velocity - self.prev_velocity) / dt if dt > 0 else 0
-        self.jerk = (new_acceleration - self.prev_acceleration) / dt if dt > 0 else 0
-        self.acceleration = new_acceleration
+        new_acceleration = (velocity - state.prev_velocity) / dt if dt > 0 else 0
+        state.jerk = (new_acceleration - state.prev_acceleration) / dt if dt > 0 else 0
+        state.acceleration = new_acceleration
         
-        self.prev_velocity = self.velocity
-        self.prev_acceleration = self.acceleration
+        state.prev_velocity = velocity
+        state.prev_acceleration = new_acceleration
         
-        self.time += dt
-        self.distance_traveled += self.velocity * dt
+        state.time += dt
+        state.distance_traveled += velocity * dt
+        if timer is not None:
+            t1 = perf_counter_ns()
+            timer.add('kinematics', t1 - t0)
+        
+        if self.telemetry is not None:
+            ex, ey, etheta = self.controller.last_errors
+            self.telemetry.record(
+                state.time, x, y, state.theta,
+                velocity, new_acceleration, state.jerk,
+                ref_x, ref_y, ref_theta,
+                target_velocity, referenceW,
+                ex, ey, etheta,
+                v, w_cmd
+            )
         
         # Check completion
-        final_point = self.trajectory[-1]
-        distance_to_end = math.hypot(final_point['x'] - self.robot_pose[0], final_point['y'] - self.robot_pose[1])
+        end_x, end_y = ref.end
+        distance_to_end = math.hypot(end_x - x, end_y - y)
         
-        path_completion = self.distance_traveled / self.path_length if self.path_length > 0 else 0
+        path_completion = state.distance_traveled / self.path_length if self.path_length > 0 else 0
         
-        if (path_completion >= 0.95 and distance_to_end < 8.0 and abs(self.velocity) < 2.0) or \
-           (self.distance_traveled > self.path_length * 1.1):
+        if (path_completion >= 0.95 and distance_to_end < 8.0 and abs(velocity) < 2.0) or \
+           (state.distance_traveled > self.path_length * 1.1):
             self.is_running = False
             
+        self.dt = dt
+        interval = self.params['snapshot_interval']
+        if interval > 0 and state.time >= self.next_snapshot_time - 1e-9:
+            self.snapshots.add(self.snapshot())
+            self.next_snapshot_time += interval
+        
+        if timer is not None:
+            timer.add('bookkeeping', perf_counter_ns() - t1)
+            
+        return self.state_dict()
+
+    def state_dict(self):
+        """The robot state as returned to API clients"""
+        state = self.state
         return {
-            'x': self.robot_pose[0],
-            'y': self.robot_pose[1],
-            'theta': self.robot_pose[2],
-            'velocity': self.velocity,
-            'acceleration': self.acceleration,
-            'jerk': self.jerk,
-            'time': self.time,
+            'x': state.x,
+            'y': state.y,
+            'theta': state.theta,
+            'velocity': state.velocity,
+            'acceleration': state.acceleration,
+            'jerk': state.jerk,
+            'time': state.time,
             'finished': not self.is_running
         }
+
+    # --- Snapshots, Seek & Rewind ---
+
+    def snapshot(self):
+        """Everything needed to resume the run from this instant"""
+        return {
+            'time': self.state.time,
+            'state': self.state.copy(),
+            'is_running': self.is_running,
+            'closest_idx': self.closest_idx,
+            'stats': self.stats.copy(),
+            'controller': copy.copy(self.controller),
+            'rng_state': self.disturbance.rng.bit_generator.state if self.disturbance is not None else None,
+            'telemetry_written': self.telemetry.written if self.telemetry is not None else 0,
+        }
+
+    def restore(self, snapshot):
+        self.state = snapshot['state'].copy()
+        self.is_running = snapshot['is_running']
+        self.closest_idx = snapshot['closest_idx']
+        self.stats = snapshot['stats'].copy()
+        self.controller = copy.copy(snapshot['controller'])
+        if self.disturbance is not None and snapshot['rng_state'] is not None:
+            self.disturbance.rng.bit_generator.state = snapshot['rng_state']
+        if self.telemetry is not None:
+            self.telemetry.rewind(snapshot['telemetry_written'])
+        self.next_snapshot_time = snapshot['time'] + self.params['snapshot_interval']
+
+    def seek(self, t):
+        """
+        Move the run to time t (either direction): restore the nearest snapshot
+        at or before t, unless the current state is closer, then replay forward.
+        Replays are deterministic, so the result matches an uninterrupted run.
+        t is clamped to [0, horizon()] and to MAX_RUN_STEPS steps, which bounds
+        the replay however long the client's profile is.
+        """
+        if self.reference is None:
+            return None
+        t = min(max(0.0, t), self.horizon(), MAX_RUN_STEPS * self.dt)
+        
+        snapshot = self.snapshots.latest_before(t)
+        current = self.state.time
+        # Replaying from the current state wins when it lies between the snapshot and t
+        replay_from_current = current <= t and (snapshot is None or snapshot['time'] <= current)
+        if not replay_from_current:
+            if snapshot is None:
+                raise ValueError("No snapshot to rewind to (snapshot_interval is 0)")
+            self.restore(snapshot)
+        
+        dt = self.dt
+        while self.is_running and self.state.time + 0.5 * dt <= t:
+            self.step(dt)
+        return self.state_dict()
+
+    def rewind(self, seconds=None):
+        """Seek back by `seconds`, or to the start of the run"""
+        target = 0.0 if seconds is None else self.state.time - seconds
+        return self.seek(target)
+
+    def summary(self):
+        """Progress and tracking statistics of the current (or last) run"""
+        state = self.state
+        summary = {
+            'running': self.is_running,
+            'time': state.time,
+            'distance_traveled': state.distance_traveled,
+            'path_length': self.path_length,
+        }
+        if self.reference is not None:
+            end_x, end_y = self.reference.end
+            summary['distance_to_end'] = math.hypot(end_x - state.x, end_y - state.y)
+        summary.update(self.stats.summary())
+        controller_summary = getattr(self.controller, 'summary', None)
+        if controller_summary is not None:
+            summary['controller'] = controller_summary()
+        if self.timer is not None:
+            summary['timing'] = self.timer.summary()
+        return summary
+
+    def run(self, dt=0.01, max_time=None, collect=False):
+        """
+        Step a started simulation headlessly until it finishes.
+        Runs that never meet the completion check are cut off at max_time
+        (default: twice the profile time plus 5 s).
+        Returns the final state, or every state if collect is set.
+        """
+        if max_time is None:
+            max_time = self.horizon()
+        
+        states = []
+        state = None
+        while self.is_running and self.time < max_time:
+            state = self.step(dt)
+            if state is None:
+                break
+            if collect:
+                states.append(state)
+        
+        return states if collect else state
+
+def run_headless(trajectory, profile, path_length, params, start_pose, dt=0.01, max_time=None):
+    """
+    Run a routine to completion on a fresh Simulation.
+    Returns (telemetry rows for every step, end-of-run summary).
+    Raises ValueError if the run could take more than MAX_RUN_STEPS steps.
+    """
+    total_time = profile[-1]['time'] if profile else 0.0
+    if max_time is None:
+        max_time = run_horizon(total_time)
+    steps = run_steps(dt, max_time) + 1
+    
+    sim = Simulation()
+    sim.start(trajectory, profile, path_length, dict(params, telemetry=True, snapshot_interval=0), start_pose)
+    
+    # Size the recorder so no step of the run is overwritten
+    if steps > sim.telemetry.capacity:
+        sim.telemetry = TelemetryRecorder(steps)
+    
+    sim.run(dt=dt, max_time=max_time)
+    return sim.telemetry.rows().copy(), sim.summary()
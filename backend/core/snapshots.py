@@ -0,0 +1,38 @@
+import bisect
+
+class SnapshotBuffer:
+    """
+    Time-ordered simulation snapshots with bounded size.
+    The first snapshot (the run's start) is never evicted, so any time in the
+    run can still be reached by replaying from it.
+    """
+    def __init__(self, limit=2400):
+        self.limit = max(2, limit)
+        self.times = []
+        self.snapshots = []
+
+    def clear(self):
+        self.times.clear()
+        self.snapshots.clear()
+
+    def add(self, snapshot):
+        """Insert a snapshot, replacing one already taken at the same time"""
+        t = snapshot['time']
+        i = bisect.bisect_left(self.times, t)
+        if i < len(self.times) and abs(self.times[i] - t) < 1e-9:
+            self.snapshots[i] = snapshot
+            return
+        self.times.insert(i, t)
+        self.snapshots.insert(i, snapshot)
+        if len(self.times) > self.limit:
+            # Evict the oldest after the start snapshot
+            del self.times[1]
+            del self.snapshots[1]
+
+    def latest_before(self, t):
+        """The newest snapshot taken at or before time t, or None"""
+        i = bisect.bisect_right(self.times, t + 1e-9)
+        return self.snapshots[i - 1] if i > 0 else None
+
+    def __len__(self):
+        return len(self.times)
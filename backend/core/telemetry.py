@@ -0,0 +1,85 @@
+import io
+import numpy as np
+
+# One row per simulation step
+TELEMETRY_FIELDS = (
+    'time',
+    'x', 'y', 'theta',
+    'velocity', 'acceleration', 'jerk',
+    'ref_x', 'ref_y', 'ref_theta',                      # Lookahead reference pose
+    'ref_velocity', 'ref_omega',                        # Feedforward inputs to the controller
+    'error_forward', 'error_lateral', 'error_heading',  # Controller errors (robot frame)
+    'cmd_velocity', 'cmd_omega',                        # Controller outputs, before limits
+)
+TELEMETRY_DTYPE = np.dtype([(name, '<f8') for name in TELEMETRY_FIELDS])
+
+class TelemetryRecorder:
+    """
+    Fixed-capacity ring buffer of per-step telemetry.
+    Memory is allocated once; when full, the oldest rows are overwritten.
+    """
+    def __init__(self, capacity=30000):
+        self.capacity = capacity
+        self.buffer = np.empty(capacity, dtype=TELEMETRY_DTYPE)
+        self.clear()
+
+    def clear(self):
+        self.head = 0     # Next row to write
+        self.count = 0
+        self.written = 0  # Rows ever recorded; marks a position for rewind()
+
+    def record(self, *values):
+        """Append one row; values follow TELEMETRY_FIELDS order"""
+        self.buffer[self.head] = values
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.written += 1
+
+    def rewind(self, written):
+        """Drop every row recorded after the buffer had `written` rows"""
+        drop = min(self.written - written, self.count)
+        if drop <= 0:
+            return
+        self.head = (self.head - drop) % self.capacity
+        self.count -= drop
+        self.written = written
+
+    def __len__(self):
+        return self.count
+
+    def rows(self, start_time=None, end_time=None, decimate=1):
+        """Recorded rows, oldest first, optionally limited to a time window and thinned"""
+        if self.count < self.capacity:
+            rows = self.buffer[:self.count]
+        else:
+            rows = np.concatenate((self.buffer[self.head:], self.buffer[:self.head]))
+
+        if start_time is not None or end_time is not None:
+            times = rows['time']
+            mask = np.ones(len(rows), dtype=bool)
+            if start_time is not None:
+                mask &= times >= start_time
+            if end_time is not None:
+                mask &= times <= end_time
+            rows = rows[mask]
+
+        if decimate > 1:
+            rows = rows[::decimate]
+        return rows
+
+def to_columns(rows):
+    """Column name -> list of floats, for JSON responses"""
+    return {name: rows[name].tolist() for name in TELEMETRY_FIELDS}
+
+def to_csv(rows):
+    out = io.StringIO()
+    out.write(','.join(TELEMETRY_FIELDS) + '\n')
+    if len(rows):
+        columns = np.column_stack([rows[name] for name in TELEMETRY_FIELDS])
+        np.savetxt(out, columns, delimiter=',', fmt='%.9g')
+    return out.getvalue()
+
+def to_columnar_bytes(rows):
+    """Each field as a contiguous little-endian float64 block, in TELEMETRY_FIELDS order"""
+    return b''.join(np.ascontiguousarray(rows[name]).tobytes() for name in TELEMETRY_FIELDS)
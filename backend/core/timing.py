@@ -0,0 +1,61 @@
+import time
+
+perf_counter_ns = time.perf_counter_ns
+
+class Histogram:
+    """Nanosecond durations in power-of-two buckets, with exact count/total/max"""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = [0] * 64 # Bucket b holds durations in [2^(b-1), 2^b) ns
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        self.buckets[min(ns.bit_length(), 63)] += 1
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(1 << b, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ns': self.total,
+            'mean_ns': self.total / self.count if self.count else 0.0,
+            'max_ns': self.max,
+            'p50_ns': self.percentile(0.5),
+            'p90_ns': self.percentile(0.9),
+            'p99_ns': self.percentile(0.99),
+            'buckets': {str(1 << b): n for b, n in enumerate(self.buckets) if n},
+        }
+
+class StageTimer:
+    """Named Histograms, created on first use"""
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, ns):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram()
+        histogram.add(ns)
+
+    def clear(self):
+        self.stages.clear()
+
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in self.stages.items()}
@@ -0,0 +1,91 @@
+import math
+
+class ErrorStats:
+    """Running RMS / max-magnitude of one error signal"""
+    __slots__ = ('count', 'sum_sq', 'max_abs', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.sum_sq = 0.0
+        self.max_abs = 0.0
+        self.last = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.sum_sq += value * value
+        magnitude = abs(value)
+        if magnitude > self.max_abs:
+            self.max_abs = magnitude
+        self.last = value
+
+    def copy(self):
+        other = ErrorStats.__new__(ErrorStats)
+        other.count = self.count
+        other.sum_sq = self.sum_sq
+        other.max_abs = self.max_abs
+        other.last = self.last
+        return other
+
+    def summary(self):
+        return {
+            'rms': math.sqrt(self.sum_sq / self.count) if self.count else 0.0,
+            'max': self.max_abs,
+            'last': self.last,
+        }
+
+class TrackingStats:
+    """
+    Tracking quality of a run, updated in O(1) per step.
+
+    - cross_track: signed lateral offset from the closest path point (+ = right of the path)
+    - along_track: distance along the path ahead (+) or behind (-) the profile's schedule
+    - heading: robot heading minus path heading at the closest point, wrapped to [-pi, pi)
+    - saturation counts: steps where the angular velocity or acceleration limit clipped the command
+    """
+    def __init__(self):
+        self.steps = 0
+        self.cross_track = ErrorStats()
+        self.along_track = ErrorStats()
+        self.heading = ErrorStats()
+        self.angular_saturated = 0
+        self.accel_saturated = 0
+
+    def update(self, cross_track, along_track, heading, angular_saturated, accel_saturated):
+        self.steps += 1
+        self.cross_track.add(cross_track)
+        self.along_track.add(along_track)
+        self.heading.add(heading)
+        if angular_saturated:
+            self.angular_saturated += 1
+        if accel_saturated:
+            self.accel_saturated += 1
+
+    def copy(self):
+        """Independent copy, for simulation snapshots (much cheaper than copy.deepcopy)"""
+        other = TrackingStats.__new__(TrackingStats)
+        other.steps = self.steps
+        other.cross_track = self.cross_track.copy()
+        other.along_track = self.along_track.copy()
+        other.heading = self.heading.copy()
+        other.angular_saturated = self.angular_saturated
+        other.accel_saturated = self.accel_saturated
+        return other
+
+    def summary(self):
+        steps = self.steps or 1
+        return {
+            'steps': self.steps,
+            'cross_track_error': self.cross_track.summary(),
+            'along_track_error': self.along_track.summary(),
+            'heading_error': self.heading.summary(),
+            'saturation': {
+                'max_angular_vel': {
+                    'count': self.angular_saturated,
+                    'fraction': self.angular_saturated / steps,
+                },
+                'max_accel': {
+                    'count': self.accel_saturated,
+                    'fraction': self.accel_saturated / steps,
+                },
+            },
+        }
@@ -1,15 +1,35 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header, Depends
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response, FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-import numpy as np
+import json
 import math
 import os
+import random
+import threading
+import time
 
-from core.geometry import cubic_bezier, cubic_bezier_derivative
+from core.geometry import sample_path, path_points, path_delta, apply_path_delta
 from core.motion import generate_profile_points
-from core.simulation import Simulation
+from core.simulation import ENGINE_VERSION, run_headless
+from core.sessions import DEFAULT_SESSION, make_session_store
+from core.montecarlo import TrialPool, run_monte_carlo
+from core.lod import PathLOD
+from core.document import (
+    PROFILE_FIELDS, TRAJECTORY_FIELDS, DocumentParser, build_document, check_points, document_checksums,
+    document_metadata, document_section, is_number, verify_checksums
+)
+from core.reference import compile_reference
+from core.setpoints import SETPOINT_FIELDS, setpoint_table
+from core import robotfile
+from core.cache import CACHES, ArtifactStore, LRUCache, ResultCache, content_hash, register_cache
+from core.timing import StageTimer, perf_counter_ns
+from core.metrics import Registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.profiling import ProfileCapture, ProfileStore
+from core.executor import BoundedExecutor, Coalescer, Overloaded, Superseded, profile_capture
+from core.telemetry import TELEMETRY_FIELDS, to_columns, to_csv, to_columnar_bytes
 
 app = FastAPI()
 
@@ -22,8 +42,221 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Simulation State (Single Instance for now)
-sim_instance = Simulation()
+# Per-route request timing histograms for /api/timing, enabled with SIM_TIMING=1.
+# Requests are timed once, by time_requests below, which also feeds /metrics.
+request_timer = StageTimer() if os.environ.get("SIM_TIMING", "0") not in ("", "0") else None
+
+# --- Simulation sessions ---
+# One simulation per X-Session-ID header. The memory store only works with a
+# single server process; with SESSION_STORE=sqlite every worker process shares
+# the sessions in SESSION_DB, so uvicorn can run with --workers N.
+session_store = make_session_store(
+    os.environ.get("SESSION_STORE", "memory"),
+    path=os.environ.get("SESSION_DB", "sessions.db"),
+    ttl=float(os.environ.get("SESSION_TTL", "3600")),
+    limit=int(os.environ.get("SESSION_LIMIT", "64")),
+)
+
+def session_id(x_session_id: str = Header(DEFAULT_SESSION)):
+    if not 0 < len(x_session_id) <= 128:
+        raise HTTPException(status_code=400, detail="X-Session-ID must be 1-128 characters")
+    return x_session_id
+
+# --- Worker pools ---
+# CPU-bound handlers run here rather than on the event loop, so one heavy
+# request cannot stall every other client. Full pools answer 503.
+interactive_pool = BoundedExecutor(
+    "interactive",
+    workers=int(os.environ.get("INTERACTIVE_WORKERS", "4")),
+    max_queue=int(os.environ.get("INTERACTIVE_QUEUE", "32")),
+)
+batch_pool = BoundedExecutor(
+    "batch",
+    workers=int(os.environ.get("BATCH_WORKERS", "2")),
+    max_queue=int(os.environ.get("BATCH_QUEUE", "8")),
+    kind=os.environ.get("BATCH_EXECUTOR", "process"),
+)
+# Monte Carlo fans out to its own worker processes; this only bounds how many run at once
+montecarlo_pool = BoundedExecutor(
+    "montecarlo",
+    workers=int(os.environ.get("MONTECARLO_CONCURRENCY", "1")),
+    max_queue=int(os.environ.get("MONTECARLO_QUEUE", "2")),
+)
+POOLS = (interactive_pool, batch_pool, montecarlo_pool)
+# The processes Monte Carlo trials run in, shared by every request
+trial_pool = TrialPool(int(os.environ.get("MONTECARLO_WORKERS", "0")) or None)
+MONTECARLO_MAX_TRIALS = int(os.environ.get("MONTECARLO_MAX_TRIALS", "10000"))
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# Latest-wins for the drag-time endpoints: a request carrying X-Client-ID
+# supersedes the same client's older, still pending request to that route
+coalescer = Coalescer()
+
+@app.exception_handler(Superseded)
+async def superseded_handler(request: Request, exc: Superseded):
+    return JSONResponse(status_code=409, content={"detail": "Superseded by a newer request", "superseded": True})
+
+def coalesce_key(request: Request, x_client_id: Optional[str] = Header(None), session: str = Depends(session_id)):
+    """Coalescing key of a request, or None when it has no X-Client-ID"""
+    if x_client_id is None:
+        return None
+    return (x_client_id, session, request.url.path)
+
+@app.on_event("shutdown")
+def shutdown_pools():
+    for pool in POOLS:
+        pool.shutdown()
+    trial_pool.shutdown()
+
+def json_response(payload):
+    """Encode a JSON body up front, skipping FastAPI's per-value response encoding"""
+    return Response(content=json.dumps(payload), media_type="application/json")
+
+# Completed headless runs, keyed by their inputs. SIM_CACHE_DIR keeps them across restarts.
+result_cache = register_cache("results", ResultCache(
+    max_bytes=int(float(os.environ.get("SIM_CACHE_MB", "64")) * 2**20),
+    directory=os.environ.get("SIM_CACHE_DIR") or None,
+    max_disk_bytes=int(float(os.environ.get("SIM_CACHE_DISK_MB", "512")) * 2**20),
+))
+
+# Generated trajectories and profiles, referenced by id from the /api/sim/* requests.
+# Set ARTIFACT_DIR to share them between worker processes.
+artifacts = register_cache("artifacts", ArtifactStore(
+    ttl=float(os.environ.get("ARTIFACT_TTL", "600")),
+    max_items=int(os.environ.get("ARTIFACT_LIMIT", "256")),
+    directory=os.environ.get("ARTIFACT_DIR") or None,
+))
+
+# Level-of-detail pyramids, built on first request per trajectory or profile id
+lod_cache = register_cache("lod", LRUCache(int(os.environ.get("LOD_CACHE_ITEMS", "64"))))
+
+# --- Metrics (Prometheus text format at /metrics) ---
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+
+metrics = Registry()
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_latency = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS, ("method", "route"))
+trajectory_points = metrics.histogram(
+    "trajectory_points", "Waypoints per generated or submitted trajectory", SIZE_BUCKETS, ("route",))
+profile_points = metrics.histogram(
+    "profile_points", "Points per generated or submitted motion profile", SIZE_BUCKETS, ("route",))
+metrics.gauge(
+    "sim_sessions_active", "Simulation sessions with a run in progress",
+    collect=lambda: {(): session_store.active()})
+metrics.counter(
+    "cache_hits_total", "Cache lookups served from the cache", ("cache",),
+    collect=lambda: {(name,): cache.hits for name, cache in CACHES.items()})
+metrics.counter(
+    "cache_misses_total", "Cache lookups that missed", ("cache",),
+    collect=lambda: {(name,): cache.misses for name, cache in CACHES.items()})
+metrics.gauge(
+    "cache_hit_ratio", "Fraction of cache lookups served from the cache", ("cache",),
+    collect=lambda: {
+        (name,): cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0
+        for name, cache in CACHES.items()
+    })
+metrics.gauge(
+    "worker_pool_running", "Calls running per worker pool", ("pool",),
+    collect=lambda: {(pool.name,): pool.stats()['running'] for pool in POOLS})
+metrics.gauge(
+    "worker_pool_queued", "Calls waiting per worker pool", ("pool",),
+    collect=lambda: {(pool.name,): pool.stats()['queued'] for pool in POOLS})
+metrics.counter(
+    "worker_pool_rejected_total", "Calls refused with 503 because the pool was full", ("pool",),
+    collect=lambda: {(pool.name,): pool.rejected for pool in POOLS})
+metrics.counter(
+    "requests_superseded_total", "Requests answered 409 because a newer one from the same client replaced them",
+    collect=lambda: {(): coalescer.superseded})
+metrics.gauge(
+    "cache_entries", "Entries held in memory per cache", ("cache",),
+    collect=lambda: {(name,): len(cache) for name, cache in CACHES.items()})
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = perf_counter_ns()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = perf_counter_ns() - started
+        route = request.scope.get("route")
+        if route is not None and hasattr(route, "methods"):
+            path = route.path
+            if request_timer is not None:
+                request_timer.add(f"{request.method} {path}", elapsed)
+        else:
+            path = "other"
+        http_requests.inc(request.method, path, status)
+        http_latency.observe(elapsed * 1e-9, request.method, path)
+
+# --- Request profiling (opt-in: set PROFILE_DIR) ---
+# The worker-pool calls of requests to PROFILE_ROUTES (path prefixes) are run under
+# cProfile when they carry an `X-Profile: 1` header, or at random with probability
+# PROFILE_SAMPLE_RATE.
+PROFILE_ROUTES = tuple(
+    prefix for prefix in os.environ.get("PROFILE_ROUTES", "/api/path/generate,/api/sim/").split(",") if prefix
+)
+profile_sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+profile_store = ProfileStore(
+    os.environ["PROFILE_DIR"], max_files=int(os.environ.get("PROFILE_MAX_FILES", "50"))
+) if os.environ.get("PROFILE_DIR") else None
+profile_lock = threading.Lock() # Only one request is profiled at a time
+
+if profile_store is not None:
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        path = request.url.path
+        if not path.startswith(PROFILE_ROUTES):
+            return await call_next(request)
+        if request.headers.get("X-Profile") == "1":
+            trigger = "header"
+        elif profile_sample_rate > 0 and random.random() < profile_sample_rate:
+            trigger = "sample"
+        else:
+            return await call_next(request)
+        # Overlapping requests go unprofiled rather than waiting
+        if not profile_lock.acquire(blocking=False):
+            return await call_next(request)
+        
+        try:
+            # Profile the pooled work where it runs, leaving the event loop unprofiled
+            capture = ProfileCapture()
+            started = time.time()
+            token = profile_capture.set(capture)
+            try:
+                response = await call_next(request)
+            finally:
+                profile_capture.reset(token)
+            stats = capture.stats()
+            if stats is None:
+                return response
+            capture_id = profile_store.save(
+                stats,
+                method=request.method,
+                path=path,
+                trigger=trigger,
+                status=response.status_code,
+                started=started,
+                duration_ms=(time.time() - started) * 1e3,
+            )
+        finally:
+            profile_lock.release()
+        response.headers["X-Profile-ID"] = capture_id
+        return response
+
+def observe_sizes(route, trajectory=None, profile=None):
+    if trajectory is not None:
+        trajectory_points.observe(len(trajectory), route)
+    if profile is not None:
+        profile_points.observe(len(profile), route)
 
 # --- Data Models ---
 class Point(BaseModel):
@@ -32,6 +265,7 @@ class Point(BaseModel):
 
 class PathRequest(BaseModel):
     control_points: List[Point]
+    base_id: Optional[str] = None  # trajectory_id the client holds; the response is then a delta against it
 
 class ProfileRequest(BaseModel):
     path_length: float
@@ -41,88 +275,135 @@ class ProfileRequest(BaseModel):
     max_decel: float
     max_jerk: float
 
-class SimStartRequest(BaseModel):
-    trajectory: List[Dict] # List of waypoint dicts
-    profile: List[Dict]    # List of profile points
-    path_length: float
+class RouteInputs(BaseModel):
+    trajectory: Optional[List[Dict]] = None # List of waypoint dicts, or
+    trajectory_id: Optional[str] = None     # the id returned by /api/path/generate
+    profile: Optional[List[Dict]] = None    # List of profile points, or
+    profile_id: Optional[str] = None        # the id returned by /api/motion/profile
+    path_length: Optional[float] = None     # Defaults to the length stored with trajectory_id
+
+class SimStartRequest(RouteInputs):
     params: Dict           # kx, ky, ktheta, etc.
     start_pose: List[float] # [x, y, theta]
 
+class SeekRequest(BaseModel):
+    time: float             # Seconds from the start of the run
+
+class RewindRequest(BaseModel):
+    seconds: Optional[float] = None # None rewinds to the start
+
+class SimRunRequest(SimStartRequest):
+    dt: float = 0.01
+    max_time: Optional[float] = None
+    decimate: int = 1              # Response only; does not affect the cached run
+
+class MonteCarloRequest(SimStartRequest):
+    trials: int = 100
+    seed: int = 0
+    noise: Dict = {}               # start_x, start_y, start_theta, velocity, slip, heading
+    dt: float = 0.01
+    max_time: Optional[float] = None
+    workers: Optional[int] = None  # Defaults to, and is capped at, MONTECARLO_WORKERS
+    include_samples: bool = False
+
+def resolve_inputs(req):
+    """(trajectory, profile, path_length) of a request, looking up stored ids"""
+    if (req.trajectory is None) == (req.trajectory_id is None):
+        raise HTTPException(status_code=400, detail="Pass one of trajectory or trajectory_id")
+    if (req.profile is None) == (req.profile_id is None):
+        raise HTTPException(status_code=400, detail="Pass one of profile or profile_id")
+    
+    trajectory, profile, path_length = req.trajectory, req.profile, req.path_length
+    if req.trajectory_id is not None:
+        path = artifacts.get("path", req.trajectory_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired trajectory_id")
+        trajectory = path["trajectory"]
+        if path_length is None:
+            path_length = path["length"]
+    if req.profile_id is not None:
+        profile = artifacts.get("profile", req.profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired profile_id")
+    if path_length is None:
+        raise HTTPException(status_code=400, detail="path_length is required with an inline trajectory")
+    return trajectory, profile, path_length
+
+class PathFileRequest(RouteInputs):
+    control_points: List[Point] = []
+    action_points: Dict = {}
+    motion_profile: Dict = {}      # type, max_speed, max_acceleration, max_deceleration, max_jerk
+    metadata: Dict = {}            # Overrides of the metadata computed from the route
+
+class SetpointRequest(RouteInputs):
+    rate: float = 100.0            # Hz, 50 to 1000
+    format: str = "json"           # 'json' or 'binary'
+    params: Dict = {}              # reference_spacing, curvature_smoothing
+
+class PlanRequest(BaseModel):
+    control_points: List[Point]
+    type: str # Profile: 'trapezoidal' or 's-curve'
+    max_vel: float
+    max_accel: float
+    max_decel: float
+    max_jerk: float
+    simulate: bool = False         # Also run a headless simulation
+    params: Dict = {}
+    start_pose: Optional[List[float]] = None # Defaults to the path's first point and heading
+    base_id: Optional[str] = None  # As for PathRequest
+    dt: float = 0.01
+    max_time: Optional[float] = None
+    decimate: int = 1
+    return_trajectory: bool = True
+    return_profile: bool = True
+    return_telemetry: bool = False
+
 # --- Endpoints ---
 
 @app.post("/api/path/generate")
-async def generate_path(req: PathRequest):
-    control_points = [[p.x, p.y] for p in req.control_points]
-    if len(control_points) < 2:
-        return {"trajectory": [], "length": 0}
-    
-    trajectory = []
-    cumulative_distance = 0
-    path_length = 0
-    
-    # Re-implementing generateTrajectory logic
-    for i in range(0, len(control_points) - 1, 3):
-        if i + 3 < len(control_points):
-            p0 = np.array(control_points[i])
-            p1 = np.array(control_points[i + 1])
-            p2 = np.array(control_points[i + 2])
-            p3 = np.array(control_points[i + 3])
-            
-            prev_pt = p0
-            for t in np.linspace(0.025, 1, 120): # 40 pt density to 120 pt density
-                pt = cubic_bezier(t, p0, p1, p2, p3)
-                derivative = cubic_bezier_derivative(t, p0, p1, p2, p3)
-                
-                # 0-deg=Up Angle
-                angle = math.atan2(derivative[0], derivative[1])
-                
-                seg_dist = np.linalg.norm(pt - prev_pt)
-                cumulative_distance += seg_dist
-                
-                trajectory.append({
-                    'x': float(pt[0]), 'y': float(pt[1]), 'theta': float(angle),
-                    'distance': float(cumulative_distance), 'curvature': 0.0
-                })
-                prev_pt = pt
-                
-        elif i + 1 < len(control_points):
-            p0 = np.array(control_points[i])
-            p1 = np.array(control_points[i + 1])
-            direction = p1 - p0
-            angle = math.atan2(direction[0], direction[1]) if np.linalg.norm(direction) > 0 else 0
-            
-            prev_pt = p0
-            for t in np.linspace(0.05, 1, 20):
-                pt = p0 + (p1 - p0) * t
-                seg_dist = np.linalg.norm(pt - prev_pt)
-                cumulative_distance += seg_dist
-                
-                trajectory.append({
-                    'x': float(pt[0]), 'y': float(pt[1]), 'theta': float(angle),
-                    'distance': float(cumulative_distance), 'curvature': 0.0
-                })
-                prev_pt = pt
-                
-    path_length = cumulative_distance
-    
-    # Calculate curvature
-    for i in range(1, len(trajectory) - 1):
-        prev_angle = trajectory[i - 1]['theta']
-        next_angle = trajectory[i + 1]['theta']
-        delta_angle = (next_angle - prev_angle + math.pi) % (2 * math.pi) - math.pi
-        delta_dist = trajectory[i + 1]['distance'] - trajectory[i - 1]['distance']
-        if delta_dist > 0.01:
-            trajectory[i]['curvature'] = delta_angle / delta_dist
-            
-    return {"trajectory": trajectory, "length": path_length}
+async def generate_path(req: PathRequest, key=Depends(coalesce_key)):
+    return await coalescer.run(
+        key, interactive_pool, build_path, [[p.x, p.y] for p in req.control_points], req.base_id
+    )
+
+def build_path(control_points, base_id=None):
+    path = generate_trajectory(control_points, base_id)
+    observe_sizes("/api/path/generate", trajectory=path["trajectory"])
+    body = {"length": path["length"], "trajectory_id": path["trajectory_id"]}
+    if path["delta"] is not None:
+        body["delta"] = path["delta"]
+    else:
+        body["trajectory"] = path["trajectory"]
+    return json_response(body)
+
+def generate_trajectory(control_points, base_id=None):
+    """
+    Sample and store a path. When the base trajectory is still stored and
+    little of it changed, also return the delta from it; the stored result is
+    then the base with the delta applied, which is what the client rebuilds.
+    """
+    columns, path_length = sample_path(control_points)
+    trajectory = path_points(columns)
+    delta = None
+    base = artifacts.get("path", base_id) if base_id else None
+    if base is not None:
+        delta = path_delta(base["trajectory"], trajectory)
+        if delta is not None:
+            trajectory = apply_path_delta(base["trajectory"], delta)
+            path_length = trajectory[-1]["distance"]
+            delta["base_id"] = base_id
+    trajectory_id = artifacts.put("path", {"trajectory": trajectory, "length": path_length})
+    return {"trajectory": trajectory, "length": path_length, "trajectory_id": trajectory_id, "delta": delta}
 
 @app.post("/api/motion/profile")
-async def generate_profile(req: ProfileRequest):
+async def generate_profile(req: ProfileRequest, key=Depends(coalesce_key)):
     # REMOVED: avg_speed = req.max_vel * 0.5 ...
     # REMOVED: total_time = max(3.0, req.path_length / avg_speed)
     
     # Pass path_length directly as the second argument
-    profile = generate_profile_points(
+    profile, profile_id = await coalescer.run(
+        key, interactive_pool,
+        build_profile,
         req.type, 
         req.path_length,  # <--- Changed from total_time to path_length
         req.max_vel, 
@@ -130,23 +411,467 @@ async def generate_profile(req: ProfileRequest):
         req.max_decel, 
         req.max_jerk
     )
-    return {"profile": profile}
+    observe_sizes("/api/motion/profile", profile=profile)
+    return {"profile": profile, "profile_id": profile_id}
+
+def build_profile(*args):
+    profile = generate_profile_points(*args)
+    return profile, artifacts.put("profile", profile)
+
+@app.post("/api/plan")
+async def plan(req: PlanRequest, key=Depends(coalesce_key)):
+    if req.decimate < 1:
+        raise HTTPException(status_code=400, detail="decimate must be >= 1")
+    if req.dt <= 0:
+        raise HTTPException(status_code=400, detail="dt must be > 0")
+    
+    planned = await coalescer.run(
+        key, interactive_pool,
+        build_plan, [[p.x, p.y] for p in req.control_points],
+        req.type, req.max_vel, req.max_accel, req.max_decel, req.max_jerk, req.base_id
+    )
+    observe_sizes("/api/plan", planned["trajectory"], planned["profile"])
+    run = None
+    if req.simulate:
+        trajectory = planned["trajectory"]
+        if not trajectory:
+            raise HTTPException(status_code=400, detail="At least two control points are required to simulate")
+        start_pose = req.start_pose or [trajectory[0]["x"], trajectory[0]["y"], trajectory[0]["theta"]]
+        run = await run_cached(
+            trajectory, planned["profile"], planned["length"], req.params, start_pose, req.dt, req.max_time
+        )
+    return await interactive_pool.run(encode_plan, req, planned, run)
+
+def build_plan(control_points, profile_type, max_vel, max_accel, max_decel, max_jerk, base_id=None):
+    """Path and profile in one pass; the profile is planned over the sampled path's length"""
+    planned = generate_trajectory(control_points, base_id)
+    profile = generate_profile_points(profile_type, planned["length"], max_vel, max_accel, max_decel, max_jerk)
+    planned["profile"] = profile
+    planned["profile_id"] = artifacts.put("profile", profile)
+    return planned
+
+def encode_plan(req, planned, run):
+    payload = {
+        "length": planned["length"],
+        "trajectory_id": planned["trajectory_id"],
+        "profile_id": planned["profile_id"],
+    }
+    if req.return_trajectory and planned["delta"] is not None:
+        payload["delta"] = planned["delta"]
+    elif req.return_trajectory:
+        payload["trajectory"] = planned["trajectory"]
+    if req.return_profile:
+        payload["profile"] = planned["profile"]
+    if run is not None:
+        key, cached, (rows, summary) = run
+        payload["simulation"] = {"key": key, "cached": cached, "summary": summary}
+        if req.return_telemetry:
+            rows = rows[::req.decimate]
+            payload["simulation"]["rows"] = len(rows)
+            payload["simulation"]["columns"] = to_columns(rows)
+    return json_response(payload)
+
+@app.get("/api/path/{trajectory_id}/lod")
+async def path_lod(trajectory_id: str, tolerance: float = 0.0):
+    if tolerance < 0:
+        raise HTTPException(status_code=400, detail="tolerance must be >= 0")
+    return await interactive_pool.run(build_path_lod, trajectory_id, tolerance)
+
+def build_path_lod(trajectory_id, tolerance):
+    path = artifacts.get("path", trajectory_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired trajectory_id")
+    trajectory = path["trajectory"]
+    lod = lod_cache.get(("path", trajectory_id))
+    if lod is None:
+        lod = PathLOD([p["x"] for p in trajectory], [p["y"] for p in trajectory])
+        lod_cache.put(("path", trajectory_id), lod)
+    level_tolerance, indices = lod.level(tolerance)
+    return json_response({
+        "trajectory_id": trajectory_id,
+        "tolerance": level_tolerance,
+        "levels": [level[0] for level in lod.levels],
+        "count": lod.count,
+        "trajectory": [trajectory[i] for i in indices.tolist()],
+    })
 
 @app.post("/api/sim/start")
-async def start_sim(req: SimStartRequest):
-    sim_instance.start(req.trajectory, req.profile, req.path_length, req.params, req.start_pose)
+async def start_sim(req: SimStartRequest, session: str = Depends(session_id)):
+    trajectory, profile, path_length = resolve_inputs(req)
+    observe_sizes("/api/sim/start", trajectory, profile)
+    try:
+        await interactive_pool.run(
+            session_store.start, session,
+            trajectory, profile, path_length, req.params, req.start_pose
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"status": "started"}
 
 @app.post("/api/sim/step")
-async def step_sim():
-    state = sim_instance.step(dt=0.01) # 10ms step
+async def step_sim(session: str = Depends(session_id)):
+    state = await interactive_pool.run(session_store.call, session, lambda sim: sim.step(dt=0.01)) # 10ms step
     if state is None:
         return {"running": False}
     return {"running": True, "state": state}
 
+@app.post("/api/sim/seek")
+async def seek_sim(req: SeekRequest, session: str = Depends(session_id)):
+    try:
+        state, running = await interactive_pool.run(
+            session_store.call, session, lambda sim: (sim.seek(req.time), sim.is_running)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if state is None:
+        return {"running": False}
+    return {"running": running, "state": state}
+
+@app.post("/api/sim/rewind")
+async def rewind_sim(req: RewindRequest, session: str = Depends(session_id)):
+    try:
+        state, running = await interactive_pool.run(
+            session_store.call, session, lambda sim: (sim.rewind(req.seconds), sim.is_running)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if state is None:
+        return {"running": False}
+    return {"running": running, "state": state}
+
+@app.get("/api/sim/summary")
+async def sim_summary(session: str = Depends(session_id)):
+    return await interactive_pool.run(session_store.call, session, lambda sim: sim.summary(), write=False)
+
+@app.get("/api/sim/telemetry")
+async def sim_telemetry(format: str = "json", decimate: int = 1,
+                        start: Optional[float] = None, end: Optional[float] = None,
+                        session: str = Depends(session_id)):
+    if decimate < 1:
+        raise HTTPException(status_code=400, detail="decimate must be >= 1")
+    if format not in ("json", "csv", "binary"):
+        raise HTTPException(status_code=400, detail="format must be 'json', 'csv' or 'binary'")
+    return await interactive_pool.run(encode_telemetry, session, format, decimate, start, end)
+
+def telemetry_rows(sim, start, end, decimate):
+    if sim.telemetry is None:
+        raise HTTPException(status_code=404, detail="Telemetry is disabled for this run")
+    return sim.telemetry.rows(start_time=start, end_time=end, decimate=decimate).copy()
+
+def encode_telemetry(session, format, decimate, start, end):
+    rows = session_store.call(session, lambda sim: telemetry_rows(sim, start, end, decimate), write=False)
+    
+    if format == "json":
+        return json_response({"rows": len(rows), "columns": to_columns(rows)})
+    if format == "csv":
+        return Response(content=to_csv(rows), media_type="text/csv")
+    return Response(
+        content=to_columnar_bytes(rows),
+        media_type="application/octet-stream",
+        headers={
+            "X-Telemetry-Rows": str(len(rows)),
+            "X-Telemetry-Columns": ",".join(TELEMETRY_FIELDS),
+            "X-Telemetry-Dtype": "<f8",
+        }
+    )
+
+@app.post("/api/sim/run")
+async def run_sim(req: SimRunRequest):
+    if req.decimate < 1:
+        raise HTTPException(status_code=400, detail="decimate must be >= 1")
+    if req.dt <= 0:
+        raise HTTPException(status_code=400, detail="dt must be > 0")
+    
+    trajectory, profile, path_length = resolve_inputs(req)
+    observe_sizes("/api/sim/run", trajectory, profile)
+    key, cached, (rows, summary) = await run_cached(
+        trajectory, profile, path_length, req.params, req.start_pose, req.dt, req.max_time
+    )
+    return await interactive_pool.run(encode_run, key, cached, summary, rows[::req.decimate])
+
+async def run_cached(trajectory, profile, path_length, params, start_pose, dt, max_time):
+    """(key, cached, (rows, summary)) of a headless run, from the result cache or the batch pool"""
+    # A process pool pickles the inputs and the result. Telemetry rows come back
+    # as one structured array, a single buffer copy. The waypoint and profile
+    # dicts take about 0.2 ms to send, against ~15 ms for a typical run, so they
+    # are not moved into shared memory.
+    # Hashing a long path and the cache's disk reads and writes take tens to
+    # hundreds of milliseconds, so they run in the pool, not on the event loop.
+    key, entry = await interactive_pool.run(
+        lookup_run, trajectory, profile, path_length, params, start_pose, dt, max_time
+    )
+    cached = entry is not None
+    if entry is None:
+        try:
+            entry = await batch_pool.run(
+                run_headless,
+                trajectory, profile, path_length, params, start_pose,
+                dt=dt, max_time=max_time
+            )
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            await interactive_pool.run(result_cache.put, key, *entry)
+        except Overloaded:
+            pass # The run is still returned, just not cached
+    return key, cached, entry
+
+def lookup_run(trajectory, profile, path_length, params, start_pose, dt, max_time):
+    """(key, cached entry or None) of a headless run"""
+    key = content_hash("sim-run", ENGINE_VERSION, trajectory, profile, path_length, params, start_pose, dt, max_time)
+    return key, result_cache.get(key)
+
+def encode_run(key, cached, summary, rows):
+    return json_response({
+        "key": key,
+        "cached": cached,
+        "summary": summary,
+        "rows": len(rows),
+        "columns": to_columns(rows),
+    })
+
+@app.post("/api/sim/montecarlo")
+async def monte_carlo(req: MonteCarloRequest):
+    if req.trials > MONTECARLO_MAX_TRIALS:
+        raise HTTPException(status_code=400, detail=f"trials must be at most {MONTECARLO_MAX_TRIALS}")
+    trajectory, profile, path_length = resolve_inputs(req)
+    observe_sizes("/api/sim/montecarlo", trajectory, profile)
+    try:
+        report = await montecarlo_pool.run(
+            run_monte_carlo,
+            trajectory, profile, path_length, req.params, req.start_pose,
+            noise=req.noise, trials=req.trials, seed=req.seed, dt=req.dt,
+            max_time=req.max_time, workers=req.workers, include_samples=req.include_samples,
+            pool=trial_pool
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return report
+
+@app.post("/api/path/save")
+async def path_save(req: PathFileRequest):
+    trajectory, profile, path_length = resolve_inputs(req)
+    content = await interactive_pool.run(
+        encode_path_file, trajectory, profile, path_length, [[p.x, p.y] for p in req.control_points],
+        req.action_points, req.motion_profile, req.metadata
+    )
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="path.json"'}
+    )
+
+def encode_path_file(trajectory, profile, path_length, control_points, action_points, motion_profile, metadata):
+    document = build_document(
+        trajectory, profile, path_length, control_points, action_points, motion_profile, metadata
+    )
+    document["metadata"]["checksums"] = document_checksums(document)
+    return json.dumps(document, indent=2) # Laid out like the legacy save_path_to_file
+
+@app.post("/api/path/load")
+async def path_load(request: Request):
+    # Parsed as the body arrives, so large files are never held whole. The upload
+    # holds one pool slot throughout, so it is not refused partway through.
+    parser = DocumentParser()
+    try:
+        with interactive_pool.reserve() as upload:
+            async for chunk in request.stream():
+                await upload.run(parser.feed, chunk)
+            document = await upload.run(parser.close)
+            return await upload.run(load_path_file, document)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def load_path_file(document):
+    """
+    Trajectory and profile of a v1.2 path document. Sections whose checksums
+    match are used as saved; the others are regenerated from the control
+    points and the motion profile settings, with the legacy loader's defaults.
+    """
+    metadata = document_section(document, "metadata", dict)
+    control_points = document_section(document, "control_points", list)
+    check_points(control_points, (("x", "y"), ()), "control_points")
+    action_points = document_section(document, "action_points", dict)
+    motion_profile = document_section(document, "motion_profile", dict)
+    saved_length = metadata.get("path_length")
+    if saved_length is not None and not (is_number(saved_length) and saved_length >= 0):
+        raise ValueError("metadata.path_length must be a non-negative number")
+
+    settings = {k: v for k, v in motion_profile.items() if k != "profile_points"}
+    settings.setdefault("type", metadata.get("profile_type") or "trapezoidal")
+    settings.setdefault("max_speed", metadata.get("max_velocity", 60.0))
+    settings.setdefault("max_acceleration", metadata.get("max_acceleration", 100.0))
+    settings.setdefault("max_deceleration", 100.0)
+    settings.setdefault("max_jerk", 500.0)
+    if settings["type"] not in ("trapezoidal", "s-curve"):
+        raise ValueError("motion_profile.type must be 'trapezoidal' or 's-curve'")
+    for name in ("max_speed", "max_acceleration", "max_deceleration", "max_jerk"):
+        if not (is_number(settings[name]) and settings[name] > 0):
+            raise ValueError(f"motion_profile.{name} must be a positive number")
+    valid = verify_checksums(document)
+
+    if valid["trajectory"]:
+        trajectory = check_points(document.get("trajectory"), TRAJECTORY_FIELDS, "trajectory")
+        if saved_length is not None:
+            path_length = float(saved_length)
+        else:
+            path_length = float(trajectory[-1]["distance"]) if trajectory else 0.0
+        trajectory_id = artifacts.put("path", {"trajectory": trajectory, "length": path_length})
+    else:
+        path = generate_trajectory([[p["x"], p["y"]] for p in control_points])
+        trajectory, path_length, trajectory_id = path["trajectory"], path["length"], path["trajectory_id"]
+
+    # The saved profile was planned for the saved path length
+    reuse_profile = valid["motion_profile"] and saved_length is not None and math.isclose(
+        saved_length, path_length, rel_tol=1e-9, abs_tol=1e-9
+    )
+    if reuse_profile:
+        profile = check_points(motion_profile.get("profile_points") or [], PROFILE_FIELDS, "profile_points")
+        profile_id = artifacts.put("profile", profile)
+    else:
+        profile, profile_id = build_profile(
+            settings["type"], path_length, settings["max_speed"], settings["max_acceleration"],
+            settings["max_deceleration"], settings["max_jerk"]
+        )
+
+    # Describe what was loaded: regenerated sections no longer match the saved metadata
+    loaded = {k: v for k, v in metadata.items() if k != "checksums"}
+    loaded.update(document_metadata(trajectory, profile, path_length, settings))
+    return json_response({
+        "metadata": loaded,
+        "control_points": control_points,
+        "action_points": action_points,
+        "motion_profile": settings,
+        "path_length": path_length,
+        "trajectory": trajectory,
+        "trajectory_id": trajectory_id,
+        "profile": profile,
+        "profile_id": profile_id,
+        "reused": {"trajectory": valid["trajectory"], "profile": reuse_profile},
+    })
+
+@app.post("/api/robot/export")
+async def robot_export(req: PathFileRequest):
+    trajectory, profile, path_length = resolve_inputs(req)
+    content = await interactive_pool.run(
+        encode_robot_file, trajectory, profile, path_length, [[p.x, p.y] for p in req.control_points],
+        req.action_points, req.motion_profile, req.metadata
+    )
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="path.rpth"'}
+    )
+
+def encode_robot_file(trajectory, profile, path_length, control_points, action_points, motion_profile, metadata):
+    document = build_document(
+        trajectory, profile, path_length, control_points, action_points, motion_profile, metadata
+    )
+    return robotfile.dumps(document)
+
+@app.post("/api/robot/import")
+async def robot_import(request: Request):
+    return await interactive_pool.run(decode_robot_file, await request.body())
+
+def decode_robot_file(content):
+    try:
+        document = robotfile.loads(content).to_document()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    trajectory = document["trajectory"]
+    profile = document["motion_profile"]["profile_points"]
+    path_length = document["metadata"].get("path_length")
+    if path_length is None:
+        path_length = trajectory[-1].get("distance", 0.0) if trajectory else 0.0
+    if not isinstance(path_length, (int, float)) or isinstance(path_length, bool):
+        raise HTTPException(status_code=400, detail="metadata.path_length must be a number")
+    return json_response({
+        "document": document,
+        "trajectory_id": artifacts.put("path", {"trajectory": trajectory, "length": path_length}),
+        "profile_id": artifacts.put("profile", profile),
+    })
+
+@app.post("/api/robot/setpoints")
+async def robot_setpoints(req: SetpointRequest):
+    if req.format not in ("json", "binary"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'binary'")
+    trajectory, profile, _ = resolve_inputs(req)
+    try:
+        return await interactive_pool.run(
+            encode_setpoints, trajectory, profile, req.rate, req.format, req.params
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def encode_setpoints(trajectory, profile, rate, format, params):
+    reference = compile_reference(
+        trajectory, profile,
+        spacing=params.get('reference_spacing', 0.25),
+        curvature_smoothing=params.get('curvature_smoothing', 1.0)
+    )
+    table = setpoint_table(reference, rate)
+    if format == "binary":
+        metadata = {"setpoint_rate": rate, "total_time": reference.total_time}
+        return Response(
+            content=robotfile.dumps({"metadata": metadata}, setpoints=table),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="setpoints.rpth"'}
+        )
+    return json_response({
+        "rate": rate,
+        "count": len(table["t"]),
+        "columns": {name: table[name].tolist() for name in SETPOINT_FIELDS},
+    })
+
+@app.get("/api/timing")
+async def timing(session: str = Depends(session_id)):
+    simulation = await interactive_pool.run(
+        session_store.call, session,
+        lambda sim: sim.timer.summary() if sim.timer is not None else None, write=False
+    )
+    return {
+        "simulation": simulation,
+        "requests": request_timer.summary() if request_timer is not None else None,
+    }
+
+@app.post("/api/timing/reset")
+async def reset_timing(session: str = Depends(session_id)):
+    await interactive_pool.run(
+        session_store.call, session,
+        lambda sim: sim.timer.clear() if sim.timer is not None else None, write=False
+    )
+    if request_timer is not None:
+        request_timer.clear()
+    return {"status": "reset"}
+
+@app.get("/api/profiles")
+async def list_profiles():
+    if profile_store is None:
+        return {"enabled": False, "captures": []}
+    return {"enabled": True, "captures": profile_store.list()}
+
+@app.get("/api/profiles/{capture_id}")
+async def get_profile(capture_id: str, format: str = "prof", sort: str = "cumulative", limit: int = 50):
+    path = profile_store.path(capture_id) if profile_store is not None else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="No such profile capture")
+    if format == "prof":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{capture_id}.prof")
+    if format == "text":
+        try:
+            report = profile_store.report(capture_id, sort=sort, limit=limit)
+        except KeyError as e:
+            raise HTTPException(status_code=400, detail=f"Unknown sort key {e}")
+        return Response(content=report, media_type="text/plain")
+    raise HTTPException(status_code=400, detail="format must be 'prof' or 'text'")
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/api/sim/reset")
-async def reset_sim():
-    sim_instance.reset()
+async def reset_sim(session: str = Depends(session_id)):
+    await interactive_pool.run(session_store.reset, session)
     return {"status": "reset"}
 
 # Serve Frontend
@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+import pytest
+
+# The server imports the core package as `core`, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.document import build_document
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'blueLeft-1.json')
+
+# Shared by every test: copy before editing
+
+@pytest.fixture(scope='session')
+def saved():
+    """The sample routine as saved by the planner"""
+    with open(SAMPLE_PATH) as f:
+        return json.load(f)
+
+@pytest.fixture(scope='session')
+def route(saved):
+    """(trajectory, profile points, path length) of the sample routine"""
+    return saved['trajectory'], saved['motion_profile']['profile_points'], saved['metadata']['path_length']
+
+@pytest.fixture(scope='session')
+def document(saved):
+    """The sample routine as a v1.2 path document, as /api/path/save builds it"""
+    profile = saved['motion_profile']
+    settings = {k: v for k, v in profile.items() if k != 'profile_points'}
+    control_points = [(p['x'], p['y']) for p in saved['control_points']]
+    return build_document(
+        saved['trajectory'], profile['profile_points'], saved['metadata']['path_length'],
+        control_points, saved.get('action_points'), settings
+    )
@@ -0,0 +1,33 @@
+import threading
+import numpy as np
+from core.cache import ResultCache
+
+def rows(n, value=0.0):
+    return np.full(n, value, dtype=[('time', '<f8'), ('x', '<f8')])
+
+def test_entries_survive_through_the_directory(tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    cache.put('a' * 64, rows(10, 1.5), {'steps': 10})
+    reloaded = ResultCache(directory=str(tmp_path))
+    entry = reloaded.get('a' * 64)
+    np.testing.assert_array_equal(entry[0], rows(10, 1.5))
+    assert entry[1] == {'steps': 10}
+    assert reloaded.get('b' * 64) is None
+    assert (reloaded.hits, reloaded.misses) == (1, 1)
+
+def test_concurrent_use_keeps_the_accounting(tmp_path):
+    cache = ResultCache(max_bytes=rows(100).nbytes * 8, directory=str(tmp_path), max_disk_bytes=2**16)
+    def work(worker):
+        for i in range(40):
+            key = f"{worker}-{i % 12}"
+            if cache.get(key) is None:
+                cache.put(key, rows(100, i), {'i': i})
+    threads = [threading.Thread(target=work, args=(w,)) for w in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) <= 8
+    assert cache.bytes == sum(entry[0].nbytes for entry in cache.items.values())
+    assert cache.hits + cache.misses == 6 * 40
+    assert not [p for p in tmp_path.iterdir() if p.suffix == '.tmp']
@@ -0,0 +1,25 @@
+import math
+import numpy as np
+from core.controller import LTVUnicycleController
+
+def test_batch_matches_scalar_exactly():
+    rng = np.random.default_rng(0)
+    n = 500
+    poses = np.column_stack((rng.uniform(-70, 70, n), rng.uniform(-70, 70, n), rng.uniform(-4, 4, n)))
+    references = poses + np.column_stack((rng.normal(0, 2, n), rng.normal(0, 2, n), rng.normal(0, 0.5, n)))
+    v_ref = rng.uniform(-5, 60, n)
+    v_ref[::7] = rng.uniform(-0.1, 0.1, len(v_ref[::7])) # Low-speed branch
+    w_ref = rng.uniform(-3, 3, n)
+
+    controller = LTVUnicycleController(kx=1.5, ky=3.0, ktheta=2.0)
+    v, w = controller.calculateControlBatch(poses, references, v_ref, w_ref)
+    for i in range(n):
+        expected = controller.calculateControl(poses[i].tolist(), references[i].tolist(), float(v_ref[i]), float(w_ref[i]))
+        assert (v[i], w[i]) == expected
+
+def test_batch_leaves_last_errors_alone():
+    controller = LTVUnicycleController(kx=1.5, ky=3.0, ktheta=2.0)
+    controller.calculateControl([0.0, 0.0, 0.0], [1.0, 2.0, 0.5], 10.0, 0.0)
+    errors = controller.last_errors
+    controller.calculateControlBatch([[0.0, 0.0, 0.0]], [[3.0, 1.0, -math.pi]], [5.0], [1.0])
+    assert controller.last_errors == errors
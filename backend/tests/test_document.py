@@ -0,0 +1,125 @@
+import copy
+import json
+import pytest
+from fastapi.testclient import TestClient
+from core.document import DocumentParser, document_checksums, verify_checksums
+import main
+
+@pytest.fixture(scope='module')
+def saved_document(document):
+    """The sample document with an action point and its checksums, as saved"""
+    saved = copy.deepcopy(document)
+    saved['action_points'] = {'0.5': 'intake'}
+    saved['metadata']['checksums'] = document_checksums(saved)
+    return saved
+
+@pytest.fixture(scope='module')
+def client():
+    return TestClient(main.app)
+
+def parse(data, size):
+    parser = DocumentParser()
+    for i in range(0, len(data), size):
+        parser.feed(data[i:i + size])
+    return parser.close()
+
+# --- Streaming parse ---
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 1000, 1 << 20])
+def test_any_chunking_parses_the_same(saved_document, size):
+    data = json.dumps(saved_document, indent=2).encode()
+    assert parse(data, size) == json.loads(data)
+
+def test_values_split_across_chunks():
+    data = '{"a": [1.5e-3, -12345.678, "é", true, null, {"b": []}], "c": 0}'.encode()
+    for split in range(1, len(data)):
+        parser = DocumentParser()
+        parser.feed(data[:split])
+        parser.feed(data[split:])
+        assert parser.close() == json.loads(data), split
+
+def test_number_at_end_of_chunk_waits_for_more():
+    parser = DocumentParser()
+    parser.feed(b'{"x": [12')
+    parser.feed(b'34]}')
+    assert parser.close() == {'x': [1234]}
+
+@pytest.mark.parametrize('data', [b'', b'{"x": [1, 2', b'{"x": 1', b'[1, 2]', b'{"x": 1} {}'])
+def test_truncated_or_invalid_document_is_rejected(data):
+    with pytest.raises(ValueError):
+        parse(data, 4)
+
+def test_error_offsets_are_from_the_start_of_the_document():
+    head = '{"trajectory": [' + ', '.join(['{"x": 1.0}'] * 200) + ', '
+    data = (head + '{"x": oops}]}').encode()
+    offsets = set()
+    for size in (1, 5, 64, len(data)):
+        with pytest.raises(ValueError) as error:
+            parse(data, size)
+        offsets.add(str(error.value))
+    assert len(offsets) == 1
+    assert str(len(head) + 6) in offsets.pop()
+
+# --- Checksums ---
+
+def test_checksums_match_until_a_section_changes(saved_document):
+    assert verify_checksums(saved_document) == {'trajectory': True, 'motion_profile': True}
+    edited = copy.deepcopy(saved_document)
+    edited['trajectory'][3]['x'] += 1.0
+    assert verify_checksums(edited) == {'trajectory': False, 'motion_profile': True}
+    edited = copy.deepcopy(saved_document)
+    edited['motion_profile']['max_speed'] = 10.0
+    assert verify_checksums(edited) == {'trajectory': True, 'motion_profile': False}
+
+@pytest.mark.parametrize('checksums', [None, 'sha256:0', [], {}])
+def test_missing_checksums_match_nothing(saved_document, checksums):
+    edited = copy.deepcopy(saved_document)
+    edited['metadata']['checksums'] = checksums
+    assert verify_checksums(edited) == {'trajectory': False, 'motion_profile': False}
+
+def test_load_reuses_sections_with_valid_checksums(client, saved_document):
+    response = client.post('/api/path/load', content=json.dumps(saved_document))
+    assert response.status_code == 200
+    loaded = response.json()
+    assert loaded['reused'] == {'trajectory': True, 'profile': True}
+    assert loaded['trajectory'] == saved_document['trajectory']
+    assert loaded['profile'] == saved_document['motion_profile']['profile_points']
+    assert 'checksums' not in loaded['metadata']
+
+def test_load_regenerates_edited_sections(client, saved_document):
+    edited = copy.deepcopy(saved_document)
+    edited['motion_profile']['max_speed'] = 20.0
+    response = client.post('/api/path/load', content=json.dumps(edited))
+    assert response.status_code == 200
+    loaded = response.json()
+    assert loaded['reused'] == {'trajectory': True, 'profile': False}
+    assert max(p['velocity'] for p in loaded['profile']) <= 20.0 + 1e-9
+    # The metadata describes the regenerated profile, not the saved one
+    assert loaded['metadata']['max_velocity'] == pytest.approx(max(p['velocity'] for p in loaded['profile']))
+
+def test_load_without_checksums_regenerates_both(client, saved_document):
+    edited = copy.deepcopy(saved_document)
+    del edited['metadata']['checksums']
+    loaded = client.post('/api/path/load', content=json.dumps(edited)).json()
+    assert loaded['reused'] == {'trajectory': False, 'profile': False}
+    assert loaded['path_length'] > 0
+
+@pytest.mark.parametrize('edit', [
+    lambda d: d.update(metadata=[]),
+    lambda d: d.update(control_points={}),
+    lambda d: d['metadata'].update(path_length='long'),
+    lambda d: d['motion_profile'].update(type='linear'),
+    lambda d: d['motion_profile'].update(max_jerk=0),
+])
+def test_load_rejects_malformed_documents(client, saved_document, edit):
+    edited = copy.deepcopy(saved_document)
+    edit(edited)
+    assert client.post('/api/path/load', content=json.dumps(edited)).status_code == 400
+
+def test_load_rejects_malformed_reused_points(client, saved_document):
+    edited = copy.deepcopy(saved_document)
+    edited['trajectory'][0]['x'] = 'left'
+    edited['metadata']['checksums'] = document_checksums(edited)
+    response = client.post('/api/path/load', content=json.dumps(edited))
+    assert response.status_code == 400
+    assert 'trajectory[0]' in response.json()['detail']
@@ -0,0 +1,80 @@
+import copy
+import pytest
+from fastapi.testclient import TestClient
+from core.geometry import apply_path_delta, path_delta, path_points, sample_path
+import main
+
+# Four Bezier segments
+CONTROL_POINTS = [
+    [-60, -60], [-50, -30], [-40, -20], [-30, -20], [-20, -20], [-10, -5], [0, 0],
+    [10, 5], [20, 20], [30, 20], [40, 20], [50, 40], [60, 60],
+]
+
+def waypoints(control_points):
+    return path_points(sample_path(control_points)[0])
+
+def moved(index, dx=3.0, dy=-2.0):
+    control_points = copy.deepcopy(CONTROL_POINTS)
+    control_points[index] = [control_points[index][0] + dx, control_points[index][1] + dy]
+    return control_points
+
+@pytest.mark.parametrize('index', [1, 5, 11])
+def test_single_segment_edit(index):
+    base = waypoints(CONTROL_POINTS)
+    points = waypoints(moved(index))
+    delta = path_delta(base, points)
+    assert delta is not None
+    assert len(delta['points']) < 0.5 * len(points)
+    rebuilt = apply_path_delta(base, delta)
+    assert len(rebuilt) == len(points)
+    for a, b in zip(rebuilt, points):
+        assert (a['x'], a['y'], a['theta'], a['curvature']) == (b['x'], b['y'], b['theta'], b['curvature'])
+        assert a['distance'] == pytest.approx(b['distance'], abs=1e-9)
+
+def test_edit_in_the_first_segment_starts_at_zero():
+    delta = path_delta(waypoints(CONTROL_POINTS), waypoints(moved(1)))
+    assert delta['start'] == 0
+
+def test_edit_in_the_last_segment_keeps_distances():
+    base = waypoints(CONTROL_POINTS)
+    delta = path_delta(base, waypoints(moved(11)))
+    assert delta['end'] == len(base)
+    assert delta['distance_offset'] == 0.0
+
+def test_unchanged_path_is_an_empty_delta():
+    base = waypoints(CONTROL_POINTS)
+    delta = path_delta(base, waypoints(CONTROL_POINTS))
+    assert delta['points'] == [] and apply_path_delta(base, delta) == base
+
+def test_large_edit_falls_back():
+    base = waypoints(CONTROL_POINTS)
+    assert path_delta(base, waypoints([[x + 1.0, y] for x, y in CONTROL_POINTS])) is None
+    # Three of four segments changed: more than half the path
+    edited = moved(1)
+    edited[5] = [edited[5][0] + 2.0, edited[5][1]]
+    edited[8] = [edited[8][0] + 2.0, edited[8][1]]
+    points = waypoints(edited)
+    assert path_delta(base, points) is None
+    assert path_delta(base, points, max_fraction=1.0) is not None
+
+def test_client_rebuild_matches_the_stored_trajectory():
+    client = TestClient(main.app)
+    def generate(control_points, base_id=None):
+        body = {'control_points': [{'x': x, 'y': y} for x, y in control_points], 'base_id': base_id}
+        response = client.post('/api/path/generate', json=body)
+        assert response.status_code == 200
+        return response.json()
+
+    base = generate(CONTROL_POINTS)
+    for index in (1, 5, 11):
+        edited = generate(moved(index), base['trajectory_id'])
+        assert 'trajectory' not in edited
+        rebuilt = apply_path_delta(base['trajectory'], edited['delta'])
+        stored = main.artifacts.get('path', edited['trajectory_id'])
+        assert rebuilt == stored['trajectory']
+        assert edited['length'] == stored['length'] == rebuilt[-1]['distance']
+
+    # Too large an edit sends the whole trajectory
+    edited = generate([[x + 1.0, y] for x, y in CONTROL_POINTS], base['trajectory_id'])
+    assert 'delta' not in edited
+    assert edited['trajectory'] == main.artifacts.get('path', edited['trajectory_id'])['trajectory']
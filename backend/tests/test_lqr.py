@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from core.lqr import compile_gain_table, solve_care, unicycle_error_model
+from core.reference import ReferenceTable, compile_reference
+from core.simulation import Simulation
+
+Q = np.diag([2.25, 9.0, 1.0])
+R = np.diag([1.0, 1.0])
+
+@pytest.mark.parametrize('v_r, w_r', [(1.0, 0.0), (20.0, 0.5), (60.0, -3.0), (5.0, 2.0)])
+def test_care_residual_is_near_zero(v_r, w_r):
+    A, B = unicycle_error_model(v_r, w_r)
+    P = solve_care(A, B, Q, R)
+    residual = A.T @ P + P @ A - P @ B @ np.linalg.solve(R, B.T @ P) + Q
+    assert np.max(np.abs(residual)) < 1e-9 * max(1.0, np.max(np.abs(P)))
+    # Stabilizing: the closed loop A - BK has eigenvalues in the left half plane
+    K = np.linalg.solve(R, B.T @ P)
+    assert np.all(np.linalg.eigvals(A - B @ K).real < 0)
+
+def test_unstabilizable_system_is_rejected():
+    A = np.eye(2)
+    B = np.zeros((2, 1))
+    with pytest.raises(ValueError):
+        solve_care(A, B, np.eye(2), np.eye(1))
+
+def test_gain_tables_are_cached_by_reference_content(route):
+    trajectory, profile, _ = route
+    table = compile_gain_table(compile_reference(trajectory, profile))
+    assert compile_gain_table(compile_reference(trajectory, profile)) is table
+
+def test_keyless_references_are_not_cached(route):
+    trajectory, profile, _ = route
+    reference = ReferenceTable(trajectory, profile)
+    first = compile_gain_table(reference)
+    assert compile_gain_table(reference) is not first
+    np.testing.assert_array_equal(compile_gain_table(reference).gains, first.gains)
+
+def cross_track_rms(route, **params):
+    trajectory, profile, path_length = route
+    start_pose = [trajectory[0]['x'], trajectory[0]['y'], trajectory[0]['theta']]
+    sim = Simulation()
+    sim.start(trajectory, profile, path_length, params, start_pose)
+    sim.run()
+    return sim.summary()['cross_track_error']['rms']
+
+def test_default_weights_track_better_than_ltv(route):
+    ltv = cross_track_rms(route, controller='ltv')
+    lqr = cross_track_rms(route, controller='lqr')
+    assert lqr < 0.6 * ltv
+    assert lqr < 1.2
+
+@pytest.mark.parametrize('spacing', [0.0, -1.0, float('nan')])
+def test_bad_spacing_is_rejected(route, spacing):
+    trajectory, profile, _ = route
+    with pytest.raises(ValueError):
+        compile_gain_table(compile_reference(trajectory, profile), spacing=spacing)
@@ -0,0 +1,40 @@
+import pytest
+from core.simulation import Simulation
+
+DT = 0.01
+
+def run(route, **params):
+    trajectory, profile, path_length = route
+    start_pose = [trajectory[0]['x'], trajectory[0]['y'], trajectory[0]['theta']]
+    sim = Simulation()
+    sim.start(trajectory, profile, path_length, dict(params, controller='mpc'), start_pose)
+    sim.run(dt=DT)
+    return sim.summary()
+
+@pytest.mark.parametrize('horizon', [10, 30])
+def test_solves_fit_in_the_step(route, horizon):
+    summary = run(route, mpc_horizon=horizon)['controller']
+    assert summary['solves'] > 50
+    assert summary['max_solve_time'] < DT
+    assert summary['fallbacks'] <= 0.05 * summary['solves']
+
+def test_unconverged_solves_use_the_last_iterate(route):
+    summary = run(route, mpc_deadline=1.0, mpc_max_iterations=1)
+    assert summary['controller']['truncated'] == summary['controller']['solves']
+    assert summary['controller']['fallbacks'] == 0
+    # Every iterate is inside the boxes, so w stays within max_angular_vel
+    assert summary['saturation']['max_angular_vel']['count'] == 0
+
+def test_missed_deadline_falls_back(route):
+    summary = run(route, mpc_deadline=1e-9)
+    assert summary['controller']['fallbacks'] == summary['controller']['solves']
+    assert summary['controller']['mean_iterations'] == 0
+
+def test_commands_are_floats(route):
+    summary = run(route)
+    assert type(summary['cross_track_error']['max']) is float
+    assert type(summary['cross_track_error']['last']) is float
+
+def test_deadline_must_be_positive(route):
+    with pytest.raises(ValueError):
+        run(route, mpc_deadline=0)
@@ -0,0 +1,32 @@
+import time
+import pytest
+from core.reference import MAX_GRID_POINTS, ReferenceTable, compile_reference
+from core.simulation import Simulation
+
+def straight(length, duration):
+    trajectory = [{'x': 0.0, 'y': 0.0, 'theta': 0.0}, {'x': 0.0, 'y': length, 'theta': 0.0}]
+    profile = [{'time': 0.0, 'velocity': 0.0}, {'time': duration, 'velocity': 0.0}]
+    return trajectory, profile
+
+def test_sample_routine_fits(route):
+    trajectory, profile, _ = route
+    reference = compile_reference(trajectory, profile)
+    assert len(reference.s) < MAX_GRID_POINTS and len(reference.t) < MAX_GRID_POINTS
+
+@pytest.mark.parametrize('spacing', [0.0, -0.25, float('nan'), float('inf'), 1e-9])
+def test_bad_spacing_is_rejected(spacing):
+    with pytest.raises(ValueError):
+        ReferenceTable(*straight(100.0, 5.0), spacing=spacing)
+
+def test_long_profile_is_rejected_quickly():
+    started = time.perf_counter()
+    with pytest.raises(ValueError):
+        ReferenceTable(*straight(100.0, 1e6))
+    assert time.perf_counter() - started < 1.0
+
+def test_simulation_start_rejects_oversized_references():
+    trajectory, profile = straight(100.0, 1e6)
+    with pytest.raises(ValueError):
+        Simulation().start(trajectory, profile, 100.0, {}, [0.0, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        Simulation().start(*straight(100.0, 5.0), 100.0, {'reference_spacing': 0}, [0.0, 0.0, 0.0])
@@ -0,0 +1,87 @@
+import json
+import struct
+import numpy as np
+import pytest
+from core import robotfile
+from core.reference import compile_reference
+from core.setpoints import SETPOINT_FIELDS, setpoint_table
+
+def with_header(header, data=b'\0' * 64):
+    raw = json.dumps(header).encode()
+    raw += b' ' * (-(12 + len(raw)) % 16)
+    return struct.pack('<4sHHI', b'RPTH', 1, 0, len(raw)) + raw + data
+
+def test_round_trip(document):
+    route = robotfile.loads(robotfile.dumps(document))
+    decoded = route.to_document()
+    assert decoded['metadata'] == document['metadata']
+    assert decoded['control_points'] == document['control_points']
+    assert decoded['action_points'] == document['action_points']
+    assert len(route) == len(document['trajectory'])
+    for name in robotfile.TRAJECTORY_COLUMNS:
+        expected = np.array([p[name] for p in document['trajectory']], dtype=np.float32)
+        np.testing.assert_array_equal(route.trajectory[name], expected)
+    points = document['motion_profile']['profile_points']
+    for name in robotfile.PROFILE_COLUMNS:
+        np.testing.assert_array_equal(route.profile[name], np.array([p[name] for p in points], dtype=np.float32))
+
+def test_columns_are_aligned_views(document):
+    data = robotfile.dumps(document)
+    route = robotfile.loads(data)
+    for values in route.trajectory.values():
+        assert values.dtype == np.float32 and not values.flags.writeable
+        assert values.ctypes.data % 4 == 0
+
+def test_load_memory_maps(document, tmp_path):
+    path = tmp_path / 'path.rpth'
+    path.write_bytes(robotfile.dumps(document))
+    route = robotfile.load(str(path))
+    assert route.metadata == document['metadata']
+    assert len(route.trajectory['x']) == len(document['trajectory'])
+
+def test_setpoint_round_trip(document):
+    reference = compile_reference(document['trajectory'], document['motion_profile']['profile_points'])
+    table = setpoint_table(reference, 200.0)
+    route = robotfile.loads(robotfile.dumps({'metadata': {'setpoint_rate': 200.0}}, setpoints=table))
+    assert list(route.setpoints) == list(SETPOINT_FIELDS)
+    for name in SETPOINT_FIELDS:
+        np.testing.assert_array_equal(route.setpoints[name], table[name].astype(np.float32))
+
+@pytest.mark.parametrize('data', [
+    b'RPT',
+    b'XXXX' + bytes(8),
+    struct.pack('<4sHHI', b'RPTH', 2, 0, 0),
+    struct.pack('<4sHHI', b'RPTH', 1, 0, 100) + b'{}',
+    struct.pack('<4sHHI', b'RPTH', 1, 0, 3) + b'{x}',
+])
+def test_bad_preamble_is_rejected(data):
+    with pytest.raises(ValueError):
+        robotfile.loads(data)
+
+def column(name='x', **fields):
+    return dict({'name': name, 'dtype': '<f4', 'encoding': 'raw', 'offset': 0, 'count': 1}, **fields)
+
+@pytest.mark.parametrize('header', [
+    [1],
+    {'metadata': [1]},
+    {'control_points': {}},
+    {'columns': [1]},
+    {'columns': {'trajectory': {'x': 1}}},
+    {'columns': {'trajectory': [1]}},
+    {'columns': {'trajectory': [column(name=None)]}},
+    {'columns': {'trajectory': [column(offset=-4)]}},
+    {'columns': {'trajectory': [column(count=-1)]}},
+    {'columns': {'trajectory': [column(count=1.5)]}},
+    {'columns': {'trajectory': [column(count=True)]}},
+    {'columns': {'trajectory': [column(count=100)]}},
+    {'columns': {'trajectory': [column(dtype='O')]}},
+    {'columns': {'trajectory': [column(encoding='delta')]}},
+    {'columns': {'trajectory': [column('x', count=3), column('y', offset=12, count=2)]}},
+])
+def test_bad_header_is_rejected(header):
+    with pytest.raises(ValueError):
+        robotfile.loads(with_header(header))
+
+def test_unknown_groups_are_skipped():
+    route = robotfile.loads(with_header({'columns': {'future': [1], 'trajectory': [column()]}}))
+    assert list(route.trajectory) == ['x']
@@ -0,0 +1,69 @@
+import pytest
+from core.sessions import MemorySessionStore, SQLiteSessionStore, make_session_store
+
+def start_args(route, **params):
+    trajectory, profile, path_length = route
+    start_pose = [trajectory[0]['x'] + 1.0, trajectory[0]['y'] - 1.0, trajectory[0]['theta']]
+    return trajectory, profile, path_length, params, start_pose
+
+def step(sim):
+    return sim.step(0.01)
+
+def summary(sim):
+    """The run summary without wall-clock solve times"""
+    summary = sim.summary()
+    for name in ('mean_solve_time', 'max_solve_time'):
+        summary.get('controller', {}).pop(name, None)
+    return summary
+
+@pytest.mark.parametrize('params', [
+    {'controller': 'ltv'},
+    {'controller': 'lqr'},
+    # A deadline the solves never reach, so the iteration cap alone decides them
+    {'controller': 'mpc', 'mpc_deadline': 1.0},
+])
+def test_alternating_workers_match_one_process(route, tmp_path, params):
+    memory = MemorySessionStore()
+    memory.start('s', *start_args(route, **params))
+    expected = []
+    while True:
+        state = memory.call('s', step)
+        if state is None:
+            break
+        expected.append(state)
+
+    # Two stores on one database stand in for two worker processes
+    path = str(tmp_path / 'sessions.db')
+    workers = [SQLiteSessionStore(path), SQLiteSessionStore(path)]
+    workers[0].start('s', *start_args(route, **params))
+    states = []
+    for i in range(len(expected) + 1):
+        state = workers[i % 3 % 2].call('s', step)
+        if state is None:
+            break
+        states.append(state)
+    assert states == expected
+    assert workers[1].call('s', summary, write=False) == memory.call('s', summary, write=False)
+
+def test_local_simulations_are_bounded(route, tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), limit=3)
+    for i in range(10):
+        store.start(f's{i}', *start_args(route))
+        store.call(f's{i}', step)
+    assert list(store.local) == ['s7', 's8', 's9']
+    # A dropped session is rebuilt from its row
+    other = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    expected = other.call('s0', lambda sim: sim.state_dict(), write=False)
+    assert store.call('s0', lambda sim: sim.state_dict(), write=False) == expected
+    assert len(store.local) == 3
+
+def test_expired_sessions_are_forgotten(route, tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), ttl=0.0)
+    store.start('old', *start_args(route))
+    store.start('new', *start_args(route))
+    assert list(store.local) == ['new']
+    assert store.call('old', step) is None
+
+def test_sqlite_store_uses_the_limit(tmp_path):
+    store = make_session_store('sqlite', path=str(tmp_path / 'sessions.db'), limit=5)
+    assert store.limit == 5
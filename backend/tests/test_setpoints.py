@@ -0,0 +1,39 @@
+import math
+import numpy as np
+import pytest
+from core.reference import compile_reference
+from core.setpoints import MAX_RATE, MIN_RATE, SETPOINT_FIELDS, setpoint_table
+
+@pytest.fixture(scope='module')
+def reference(route):
+    trajectory, profile, _ = route
+    return compile_reference(trajectory, profile)
+
+@pytest.mark.parametrize('rate', [MIN_RATE - 1, MAX_RATE + 1, 0.0, -100.0, math.nan])
+def test_rate_out_of_range_is_rejected(reference, rate):
+    with pytest.raises(ValueError):
+        setpoint_table(reference, rate)
+
+@pytest.mark.parametrize('rate', [MIN_RATE, 100.0, 333.0, MAX_RATE])
+def test_samples_cover_the_profile(reference, rate):
+    table = setpoint_table(reference, rate)
+    assert tuple(table) == SETPOINT_FIELDS
+    t = table['t']
+    assert all(len(table[name]) == len(t) for name in SETPOINT_FIELDS)
+    np.testing.assert_array_equal(t, np.arange(len(t)) / rate)
+    # The last sample is the first at or past the end of the profile
+    assert t[-1] >= reference.total_time - 1e-9
+    assert t[-2] < reference.total_time
+
+def test_samples_follow_the_plan(reference):
+    table = setpoint_table(reference, 100.0)
+    for i in range(0, len(table['t']), 37):
+        x, y, theta, v, omega = reference.sample_time(table['t'][i])
+        assert table['x'][i] == pytest.approx(x, abs=1e-9)
+        assert table['y'][i] == pytest.approx(y, abs=1e-9)
+        assert table['v'][i] == pytest.approx(v, abs=1e-9)
+        assert math.cos(table['theta'][i] - theta) == pytest.approx(1.0)
+
+def test_theta_is_wrapped(reference):
+    theta = setpoint_table(reference, 1000.0)['theta']
+    assert np.all(theta >= -math.pi) and np.all(theta < math.pi)
@@ -0,0 +1,78 @@
+import math
+import numpy as np
+import pytest
+from core.montecarlo import Disturbance
+from core import simulation
+from core.simulation import Simulation
+
+def start(route, **params):
+    trajectory, profile, path_length = route
+    start_pose = [trajectory[0]['x'], trajectory[0]['y'], trajectory[0]['theta']]
+    sim = Simulation()
+    sim.start(trajectory, profile, path_length, dict(params, telemetry=True), start_pose)
+    return sim
+
+def test_seek_matches_uninterrupted_run(route):
+    sim = start(route)
+    states = sim.run(collect=True)
+    rows = sim.telemetry.rows().copy()
+
+    for i in (len(states) // 3, len(states) - 2, 20): # Back, forward, back again
+        assert sim.seek(states[i]['time']) == states[i]
+    assert sim.run(collect=True) == states[21:]
+    assert sim.telemetry.rows().tobytes() == rows.tobytes() # Bitwise, so NaN columns compare too
+
+def test_rewind_replays_identically(route):
+    sim = start(route, controller='lqr')
+    states = sim.run(collect=True)
+    summary = sim.summary()
+
+    sim.rewind()
+    assert sim.state.time == 0.0 and sim.is_running
+    assert sim.run(collect=True) == states
+    assert sim.summary() == summary
+
+def test_seek_replays_disturbances(route):
+    sim = start(route)
+    sim.disturbance = Disturbance({'heading': {'std': 0.3}}, np.random.default_rng(3))
+    states = sim.run(collect=True)
+    sim.seek(1.234)
+    replayed = sim.run(collect=True)
+    assert replayed == states[len(states) - len(replayed):]
+
+def test_seek_is_clamped_to_the_horizon(route):
+    sim = start(route)
+    end = sim.run(collect=True)[-1]
+    assert sim.seek(1e12) == end
+    assert sim.seek(-5.0)['time'] == 0.0
+
+def test_seek_without_snapshots_fails(route):
+    sim = start(route, snapshot_interval=0)
+    sim.run()
+    with pytest.raises(ValueError):
+        sim.seek(1.0)
+
+def test_seek_replay_is_bounded_by_the_step_limit(monkeypatch):
+    # A profile far longer than the step limit allows, and a run that never finishes on its own
+    trajectory = [{'x': 0.0, 'y': 0.0, 'theta': 0.0}, {'x': 0.0, 'y': 10.0, 'theta': 0.0}]
+    profile = [{'time': 0.0, 'velocity': 0.0}, {'time': 900.0, 'velocity': 0.0}]
+    monkeypatch.setattr(simulation, 'MAX_RUN_STEPS', 500)
+    sim = Simulation()
+    sim.start(trajectory, profile, 1e6, {}, [0.0, 0.0, 0.0])
+    state = sim.seek(1e9)
+    assert state['time'] == pytest.approx(500 * sim.dt)
+    assert sim.is_running
+
+@pytest.mark.parametrize('capacity', [0, -5, float('nan'), 'many', True])
+def test_bad_telemetry_capacity_is_rejected(route, capacity):
+    with pytest.raises(ValueError):
+        start(route, telemetry_capacity=capacity)
+
+def test_telemetry_capacity_is_bounded(route):
+    sim = start(route, telemetry_capacity=1e12)
+    assert sim.telemetry.capacity == math.ceil(sim.horizon() / sim.dt) + 1
+    trajectory, profile, _ = route
+    long_profile = profile[:-1] + [dict(profile[-1], time=900.0)]
+    sim = Simulation()
+    sim.start(trajectory, long_profile, 1e6, {'telemetry': True, 'telemetry_capacity': 1e12}, [0.0, 0.0, 0.0])
+    assert sim.telemetry.capacity == simulation.MAX_RUN_STEPS + 1
@@ -1,19 +1,76 @@
 const API_BASE = '/api';
 
+// Each tab drives its own simulation session on the server
+function sessionId() {
+    let id = sessionStorage.getItem('sessionId');
+    if (!id) {
+        id = crypto.randomUUID();
+        sessionStorage.setItem('sessionId', id);
+    }
+    return id;
+}
+
+// Drag-time requests carry a client id; the server then only computes the
+// newest one and answers older ones still pending with 409. Those resolve to null.
+function latestWinsHeaders() {
+    return { 'Content-Type': 'application/json', 'X-Client-ID': sessionId(), 'X-Session-ID': sessionId() };
+}
+
+async function latestWins(response) {
+    if (response.status === 409) return null;
+    return await response.json();
+}
+
+// Rebuilds the trajectory from a delta response: base[start:end] is replaced
+// and later points have their distance shifted (see /api/path/generate)
+function applyPathDelta(base, delta) {
+    const tail = base.slice(delta.end).map(p => ({ ...p, distance: p.distance + delta.distance_offset }));
+    return base.slice(0, delta.start).concat(delta.points, tail);
+}
+
 export const api = {
     async generatePath(controlPoints) {
         const response = await fetch(`${API_BASE}/path/generate`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: latestWinsHeaders(),
             body: JSON.stringify({ control_points: controlPoints })
         });
-        return await response.json();
+        return await latestWins(response);
+    },
+
+    // Path and profile in one round trip. base is the { id, trajectory } the
+    // caller holds, if any; the server then only sends what changed.
+    async plan(controlPoints, profileConfig, base = null) {
+        const response = await fetch(`${API_BASE}/plan`, {
+            method: 'POST',
+            headers: latestWinsHeaders(),
+            body: JSON.stringify({
+                control_points: controlPoints,
+                base_id: base ? base.id : null,
+                type: profileConfig.type,
+                max_vel: Number(profileConfig.maxVel),
+                max_accel: Number(profileConfig.maxAccel),
+                max_decel: Number(profileConfig.maxDecel),
+                max_jerk: Number(profileConfig.maxJerk)
+            })
+        });
+        const data = await latestWins(response);
+        if (data && data.delta) {
+            data.trajectory = applyPathDelta(base.trajectory, data.delta);
+        }
+        return data;
+    },
+
+    // Simplified trajectory for drawing, accurate to `tolerance` field units
+    async pathLOD(trajectoryId, tolerance) {
+        const response = await fetch(`${API_BASE}/path/${trajectoryId}/lod?tolerance=${tolerance}`);
+        return response.ok ? await response.json() : null;
     },
 
     async generateProfile(pathLength, type, maxVel, maxAccel, maxDecel, maxJerk) {
         const response = await fetch(`${API_BASE}/motion/profile`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: latestWinsHeaders(),
             body: JSON.stringify({
                 path_length: pathLength,
                 type: type,
@@ -23,21 +80,29 @@ export const api = {
                 max_jerk: Number(maxJerk)
             })
         });
-        return await response.json();
+        return await latestWins(response);
     },
 
+    // trajectory and profile are { data, id }; the ids are sent when known,
+    // and the full data only if the server no longer has them
     async startSim(trajectory, profile, pathLength, params, startPose) {
-        const response = await fetch(`${API_BASE}/sim/start`, {
+        const send = (body) => fetch(`${API_BASE}/sim/start`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'X-Session-ID': sessionId() },
             body: JSON.stringify({
-                trajectory: trajectory,
-                profile: profile,
+                ...body,
                 path_length: pathLength,
                 params: params,
                 start_pose: startPose
             })
         });
+        let response = null;
+        if (trajectory.id && profile.id) {
+            response = await send({ trajectory_id: trajectory.id, profile_id: profile.id });
+        }
+        if (response === null || response.status === 404) {
+            response = await send({ trajectory: trajectory.data, profile: profile.data });
+        }
         return await response.json();
     },
 
@@ -45,6 +110,7 @@ export const api = {
         try {
             const response = await fetch(`${API_BASE}/sim/step`, {
                 method: 'POST',
+                headers: { 'X-Session-ID': sessionId() }
             });
             return await response.json();
         } catch (e) {
@@ -54,6 +120,9 @@ export const api = {
     },
 
     async resetSim() {
-        await fetch(`${API_BASE}/sim/reset`, { method: 'POST' });
+        await fetch(`${API_BASE}/sim/reset`, {
+            method: 'POST',
+            headers: { 'X-Session-ID': sessionId() }
+        });
     }
 };
@@ -2,6 +2,11 @@ import { api } from './api.js';
 import { FieldCanvas } from './canvas.js';
 import { MotionGraph } from './graph.js';
 
+// Path point count above which the field draws a level-of-detail view. Each
+// Bezier segment samples 120 points, so any path of two or more segments does;
+// at half a pixel such paths typically keep a quarter of their points or fewer
+const LOD_THRESHOLD = 200;
+
 class App {
     constructor() {
         this.field = new FieldCanvas('fieldCanvas', this.onPathUpdate.bind(this));
@@ -9,8 +14,10 @@ class App {
 
         this.state = {
             trajectory: [],
+            trajectoryId: null, // Server-side handles, so starts need not re-upload
             pathLength: 0,
             profile: [],
+            profileId: null,
             isSimulating: false,
             simInterval: null,
             params: {
@@ -25,6 +32,9 @@ class App {
             }
         };
 
+        this.planRequest = 0; // Sequence number of the newest path request
+        this.profileRequest = 0;
+
         this.bindControls();
     }
 
@@ -177,11 +187,21 @@ class App {
         }
 
         try {
-            const data = await api.generatePath(this.field.controlPoints);
+            const request = ++this.planRequest;
+            const base = this.state.trajectoryId
+                ? { id: this.state.trajectoryId, trajectory: this.state.trajectory }
+                : null;
+            const data = await api.plan(this.field.controlPoints, this.state.profileConfig, base);
+            // Superseded on the server, or overtaken by a newer response
+            if (data === null || request !== this.planRequest) return;
             this.state.trajectory = data.trajectory;
+            this.state.trajectoryId = data.trajectory_id;
             this.state.pathLength = data.length;
+            this.state.profile = data.profile;
+            this.state.profileId = data.profile_id;
 
-            this.field.setTrajectory(data.trajectory);
+            this.showTrajectory(data.trajectory, data.trajectory_id);
+            this.graph.update(data.profile);
 
             document.getElementById('pointCount').innerText = this.field.controlPoints.length;
             document.getElementById('pathLength').innerText = data.length.toFixed(1);
@@ -203,18 +223,28 @@ class App {
                 editorInfo.style.opacity = '0.3';
                 editorInfo.style.pointerEvents = 'none';
             }
-
-            this.updateProfile();
         } catch (e) {
             console.error("Failed to generate path", e);
         }
     }
 
+    // Large paths are drawn from the server's level-of-detail view
+    async showTrajectory(trajectory, trajectoryId) {
+        if (trajectory.length > LOD_THRESHOLD && trajectoryId) {
+            const tolerance = 0.5 * this.field.fieldSize / this.field.canvas.width; // Half a pixel
+            const lod = await api.pathLOD(trajectoryId, tolerance);
+            if (trajectoryId !== this.state.trajectoryId) return; // Replaced meanwhile
+            if (lod) trajectory = lod.trajectory;
+        }
+        this.field.setTrajectory(trajectory);
+    }
+
     async updateProfile() {
         if (this.state.pathLength <= 0) return;
 
         try {
             const c = this.state.profileConfig;
+            const request = ++this.profileRequest;
             const data = await api.generateProfile(
                 this.state.pathLength,
                 c.type,
@@ -223,7 +253,9 @@ class App {
                 c.maxDecel,
                 c.maxJerk
             );
+            if (data === null || request !== this.profileRequest) return;
             this.state.profile = data.profile;
+            this.state.profileId = data.profile_id;
             this.graph.update(data.profile);
         } catch (e) {
             console.error("Failed to generate profile", e);
@@ -249,8 +281,8 @@ class App {
 
         try {
             await api.startSim(
-                this.state.trajectory,
-                this.state.profile,
+                { data: this.state.trajectory, id: this.state.trajectoryId },
+                { data: this.state.profile, id: this.state.profileId },
                 this.state.pathLength,
                 this.state.params,
                 startPose